@@ -0,0 +1,67 @@
+import os
+import sys
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+# Migrations import the app package, so its parent directory must be importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.config import settings  # noqa: E402
+from app.models import Base  # noqa: E402
+from app.search import FTS_TABLE  # noqa: E402
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# DATABASE_URL (via app settings) wins over the placeholder in alembic.ini
+config.set_main_option("sqlalchemy.url", settings.database_url)
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # The SQLite FTS5 table and its shadow tables are maintained by app.search, not the models
+    if type_ == "table" and name.startswith(FTS_TABLE):
+        return False
+    # GIN indexes are only created on PostgreSQL (see the ddl_if calls in app.models)
+    if type_ == "index" and not reflected and obj.kwargs.get("postgresql_using") == "gin":
+        return context.get_context().dialect.name == "postgresql"
+    return True
+
+
+def run_migrations_offline():
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            # SQLite cannot ALTER most things in place; batch mode rebuilds the table instead
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,89 @@
+"""Baseline schema, as created by create_tables() before migrations were introduced
+
+Databases created by that version of the app should be stamped rather than upgraded, and
+then upgraded from there:
+
+    alembic stamp 0001
+    alembic upgrade head
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _timestamp(name):
+    return sa.Column(name, sa.DateTime(timezone=True), server_default=sa.func.now())
+
+
+def upgrade():
+    op.create_table(
+        "profiles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("github_url", sa.String(255), nullable=True),
+        sa.Column("linkedin_url", sa.String(255), nullable=True),
+        sa.Column("portfolio_url", sa.String(255), nullable=True),
+        _timestamp("created_at"),
+        _timestamp("updated_at"),
+    )
+    op.create_index("ix_profiles_id", "profiles", ["id"])
+    op.create_index("ix_profiles_email", "profiles", ["email"], unique=True)
+
+    op.create_table(
+        "skills",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        _timestamp("created_at"),
+    )
+    op.create_index("ix_skills_id", "skills", ["id"])
+    op.create_index("ix_skills_name", "skills", ["name"], unique=True)
+
+    op.create_table(
+        "profile_skills",
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id"), primary_key=True),
+        sa.Column("skill_id", sa.Integer(), sa.ForeignKey("skills.id"), primary_key=True),
+    )
+
+    op.create_table(
+        "projects",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(200), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column("links", sa.Text(), nullable=True),
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id"), nullable=False),
+        _timestamp("created_at"),
+        _timestamp("updated_at"),
+    )
+    op.create_index("ix_projects_id", "projects", ["id"])
+
+    op.create_table(
+        "work_experiences",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("company", sa.String(200), nullable=False),
+        sa.Column("position", sa.String(200), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("start_date", sa.DateTime(), nullable=False),
+        sa.Column("end_date", sa.DateTime(), nullable=True),
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id"), nullable=False),
+        _timestamp("created_at"),
+        _timestamp("updated_at"),
+    )
+    op.create_index("ix_work_experiences_id", "work_experiences", ["id"])
+
+
+def downgrade():
+    op.drop_table("work_experiences")
+    op.drop_table("projects")
+    op.drop_table("profile_skills")
+    op.drop_table("skills")
+    op.drop_table("profiles")
@@ -0,0 +1,96 @@
+"""Profile versions, skill counters, full-text search and the profile_documents read model
+
+Adds the columns and objects the app grew after the baseline, then fills in skill counters
+and search documents for the rows already there in plain SQL, so the migration does not
+change when app code does. profile_documents starts empty: reads of profiles without a
+document fall back to the live tables until it is filled with
+
+    python -m app.cli rebuild-read-model
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+# Copies of app.search's reindex statements as of this revision
+_PG_SEARCH_BACKFILL = """
+UPDATE profiles SET search_vector =
+    setweight(to_tsvector('simple', coalesce(profiles.name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce((
+        SELECT string_agg(skills.name, ' ')
+        FROM profile_skills JOIN skills ON skills.id = profile_skills.skill_id
+        WHERE profile_skills.profile_id = profiles.id
+    ), '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(profiles.description, '')), 'C')
+"""
+
+_SQLITE_SEARCH_BACKFILL = """
+INSERT INTO profile_search (rowid, name, description, skills)
+SELECT profiles.id, profiles.name, coalesce(profiles.description, ''), coalesce((
+    SELECT group_concat(skills.name, ' ')
+    FROM profile_skills JOIN skills ON skills.id = profile_skills.skill_id
+    WHERE profile_skills.profile_id = profiles.id
+), '')
+FROM profiles
+"""
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # The server default also gives every existing profile version 1
+    op.add_column("profiles", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+    op.add_column("profiles", sa.Column("search_vector", sa.Text().with_variant(TSVECTOR(), "postgresql"), nullable=True))
+    op.add_column("skills", sa.Column("profile_count", sa.Integer(), nullable=False, server_default="0"))
+
+    op.create_table(
+        "profile_documents",
+        sa.Column("profile_id", sa.Integer(), sa.ForeignKey("profiles.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("document", sa.Text(), nullable=False),
+    )
+
+    if dialect == "postgresql":
+        op.create_index("ix_profiles_search_vector", "profiles", ["search_vector"], postgresql_using="gin")
+        op.create_index(
+            "ix_skills_name_trgm", "skills", ["name"],
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        )
+    elif dialect == "sqlite":
+        op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS profile_search USING fts5(name, description, skills, prefix='2 3')")
+
+    op.execute(
+        "UPDATE skills SET profile_count = "
+        "(SELECT count(*) FROM profile_skills WHERE profile_skills.skill_id = skills.id)"
+    )
+    if dialect == "postgresql":
+        op.execute(_PG_SEARCH_BACKFILL)
+    elif dialect == "sqlite":
+        op.execute(_SQLITE_SEARCH_BACKFILL)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.drop_index("ix_skills_name_trgm", table_name="skills")
+        op.drop_index("ix_profiles_search_vector", table_name="profiles")
+    elif dialect == "sqlite":
+        op.execute("DROP TABLE IF EXISTS profile_search")
+    op.drop_table("profile_documents")
+    with op.batch_alter_table("skills") as batch:
+        batch.drop_column("profile_count")
+    with op.batch_alter_table("profiles") as batch:
+        batch.drop_column("search_vector")
+        batch.drop_column("version")
@@ -0,0 +1,31 @@
+"""Index foreign keys, skill -> profile joins and cursor orderings
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (profile_id, id) serves both the foreign key lookups made by selectinload and the
+    # id-ordered keyset cursors over one or more profiles' children
+    op.create_index("ix_projects_profile_id_id", "projects", ["profile_id", "id"])
+    op.create_index("ix_work_experiences_profile_id_id", "work_experiences", ["profile_id", "id"])
+    # The composite primary key leads with profile_id, so skill -> profiles joins had no index
+    op.create_index("ix_profile_skills_skill_id_profile_id", "profile_skills", ["skill_id", "profile_id"])
+    # Matches get_top_skills' ORDER BY profile_count DESC, name, so the top skills need no sort
+    op.create_index("ix_skills_profile_count_name", "skills", [sa.text("profile_count DESC"), "name"])
+
+
+def downgrade():
+    op.drop_index("ix_skills_profile_count_name", table_name="skills")
+    op.drop_index("ix_profile_skills_skill_id_profile_id", table_name="profile_skills")
+    op.drop_index("ix_work_experiences_profile_id_id", table_name="work_experiences")
+    op.drop_index("ix_projects_profile_id_id", table_name="projects")
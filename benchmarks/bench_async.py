@@ -0,0 +1,125 @@
+"""Compare requests/sec and latency of sync and async profile reads under high concurrency.
+
+Run from the directory containing the app package:
+
+    python -m app.benchmarks.bench_async --concurrency 200 --requests 4000
+
+Point --database-url at PostgreSQL (postgresql://...) for realistic numbers; the default
+is a temporary SQLite file, which serializes on a single writer but still shows the
+threadpool cap on the sync path.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import bulk, crud, crud_async
+from app.database import async_database_url
+from app.models import Base
+from app.schemas import Profile, ProfileCreate, ProjectCreate
+
+
+def seed(session_factory, profiles: int):
+    db = session_factory()
+    try:
+        lines = (
+            ProfileCreate(
+                name=f"Candidate {i}", email=f"candidate{i}@example.com",
+                skills=["Python", f"Skill {i % 25}"],
+                projects=[ProjectCreate(title="Project", description="Benchmark project")]
+            ).model_dump_json()
+            for i in range(profiles)
+        )
+        bulk.import_profiles(db, lines)
+    finally:
+        db.close()
+
+
+def build_sync_app(session_factory) -> FastAPI:
+    app = FastAPI()
+
+    # The session is scoped inside the handler: a yield dependency would release its
+    # connection from a second threadpool task, which deadlocks once the pool is saturated
+    @app.get("/profiles/{profile_id}", response_model=Profile)
+    def read_profile(profile_id: int):
+        with session_factory() as db:
+            return Profile.model_validate(crud.get_profile(db, profile_id))
+
+    return app
+
+
+def build_async_app(session_factory) -> FastAPI:
+    app = FastAPI()
+
+    async def get_db():
+        async with session_factory() as db:
+            yield db
+
+    @app.get("/profiles/{profile_id}", response_model=Profile)
+    async def read_profile(profile_id: int, db: AsyncSession = Depends(get_db)):
+        return await crud_async.get_profile(db, profile_id)
+
+    return app
+
+
+async def load(app: FastAPI, requests: int, concurrency: int, profiles: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(f"/profiles/{i % profiles + 1}")
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Existing database to seed and query (default: temporary SQLite)")
+    parser.add_argument("--profiles", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        sync_engine = create_engine(url, pool_size=args.pool_size, max_overflow=0)
+        Base.metadata.create_all(bind=sync_engine)
+        sync_sessions = sessionmaker(bind=sync_engine, autoflush=False)
+        seed(sync_sessions, args.profiles)
+
+        async_engine = create_async_engine(async_database_url(url), pool_size=args.pool_size, max_overflow=0)
+        async_sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        for mode, app in (("sync", build_sync_app(sync_sessions)), ("async", build_async_app(async_sessions))):
+            result = asyncio.run(load(app, args.requests, args.concurrency, args.profiles))
+            print(f"{mode:<6} {result['rps']:9.1f} req/s  p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms")
+
+        asyncio.run(async_engine.dispose())
+        sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare OFFSET and keyset pagination cost at shallow and deep pages.
+
+Run from the directory containing the app package:
+
+    python -m app.benchmarks.bench_pagination --profiles 200000 --limit 10
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import crud
+from app.models import Base, Profile
+from app.pagination import encode_cursor
+
+
+def populate(engine, count: int):
+    batch = 10000
+    with engine.begin() as conn:
+        for start in range(0, count, batch):
+            conn.execute(insert(Profile), [
+                {"name": f"Candidate {i}", "email": f"candidate{i}@example.com", "description": "Benchmark profile"}
+                for i in range(start, min(start + batch, count))
+            ])
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=200000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--page", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, args.profiles)
+        db = sessionmaker(bind=engine)()
+
+        deep_skip = (args.page - 1) * args.limit
+        # Cursors are keyed on id, so the cursor for page N is the id closing page N - 1
+        deep_cursor = encode_cursor(deep_skip)
+
+        print(f"{args.profiles} profiles, {args.limit} per page (median of {args.repeat} runs)")
+        cases = [
+            ("offset", 1, lambda: crud.get_profiles(db, skip=0, limit=args.limit)),
+            ("offset", args.page, lambda: crud.get_profiles(db, skip=deep_skip, limit=args.limit)),
+            ("keyset", 1, lambda: crud.get_profiles_page(db, limit=args.limit)),
+            ("keyset", args.page, lambda: crud.get_profiles_page(db, cursor=deep_cursor, limit=args.limit)),
+        ]
+        for mode, page, fn in cases:
+            print(f"{mode:<7} page {page:<8} {timed(fn, args.repeat):8.3f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Compare the cost of turning 100-profile pages of heavily populated profiles into JSON bytes.
+
+Run from the directory containing the app package:
+
+    python -m app.benchmarks.bench_serialization --profiles 2000 --children 20
+
+Every case starts from the same crud.get_profiles page and ends with response body bytes:
+"pydantic" is what FastAPI does for a response_model (validate, jsonable_encoder, json.dumps),
+"orm" is documents.orm_document plus dumps_bytes as used with FastJSONResponse, and "rows"
+builds the documents from Core rows with documents.load_documents instead of ORM objects.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app import bulk, crud, documents
+from app.documents import PROFILE_COLUMNS, dumps_bytes, load_documents, orm_document
+from app.models import Base, Profile
+from app.schemas import Profile as ProfileSchema, ProfileCreate, ProjectCreate, WorkExperienceCreate
+
+
+def seed(db, profiles: int, children: int):
+    start = datetime(2020, 1, 1)
+    lines = (
+        ProfileCreate(
+            name=f"Candidate {i}", email=f"candidate{i}@example.com", description="Benchmark profile " * 8,
+            skills=[f"Skill {(i + n) % 200}" for n in range(children)],
+            projects=[
+                ProjectCreate(title=f"Project {n}", description="Benchmark project " * 8, links="https://example.com")
+                for n in range(children)
+            ],
+            work_experiences=[
+                WorkExperienceCreate(company=f"Company {n}", position="Engineer", start_date=start + timedelta(days=n))
+                for n in range(children)
+            ]
+        ).model_dump_json()
+        for i in range(profiles)
+    )
+    bulk.import_profiles(db, lines)
+
+
+def pydantic_bytes(profiles) -> bytes:
+    content = jsonable_encoder([ProfileSchema.model_validate(profile) for profile in profiles])
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--children", type=int, default=20, help="Skills, projects and work experiences per profile")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        seed(db, args.profiles, args.children)
+
+        skip = args.profiles // 2
+        page = crud.get_profiles(db, skip=skip, limit=args.limit)
+        ids = [profile.id for profile in page]
+        rows = db.execute(select(*PROFILE_COLUMNS).where(Profile.id.in_(ids)).order_by(Profile.id)).all()
+        # All paths must produce the same body for the comparison to mean anything
+        assert json.loads(pydantic_bytes(page)) == json.loads(dumps_bytes([orm_document(p) for p in page]))
+
+        encoder = "orjson" if documents.orjson is not None else "json (orjson not installed)"
+        print(f"{args.limit} profiles per page, {args.children} of each child, encoder {encoder} (median of {args.repeat} runs)")
+        cases = [
+            ("query only", lambda: crud.get_profiles(db, skip=skip, limit=args.limit)),
+            ("pydantic", lambda: pydantic_bytes(page)),
+            ("orm", lambda: dumps_bytes([orm_document(profile) for profile in page])),
+            ("rows", lambda: dumps_bytes(load_documents(db, rows))),
+            ("query + pydantic", lambda: pydantic_bytes(crud.get_profiles(db, skip=skip, limit=args.limit))),
+            ("query + orm", lambda: dumps_bytes([orm_document(p) for p in crud.get_profiles(db, skip=skip, limit=args.limit)])),
+        ]
+        for name, fn in cases:
+            print(f"{name:<18} {timed(fn, args.repeat):8.3f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Run every crud read/write and HTTP endpoint at several database sizes and record the results.
+
+Run from the directory containing the app package:
+
+    python -m app.benchmarks.bench_suite --sizes 1000,100000,1000000 --output bench.json
+
+Each size runs in its own subprocess against a freshly seeded database (a temporary SQLite
+file unless --database-url points at an empty PostgreSQL database), so peak RSS is measured
+per size. The output file holds latency percentiles, throughput and peak RSS per operation,
+tagged with the git commit, so runs can be compared across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, read_model, similarity
+from app.models import Profile
+from app.pagination import encode_cursor
+from app.schemas import ProfileUpdate, ProjectCreate
+from app.seed import generate_profile, seed_profiles
+
+
+def measure(name: str, kind: str, fn: Callable[[int], None], iterations: int) -> dict:
+    """Call fn(i) for each iteration, after one warm-up call, and summarise its latency"""
+    fn(iterations)
+    samples = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    elapsed = time.perf_counter() - started
+    cuts = statistics.quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else samples * 99
+    return {
+        "name": name,
+        "kind": kind,
+        "iterations": iterations,
+        "p50_ms": round(cuts[49], 3),
+        "p90_ms": round(cuts[89], 3),
+        "p99_ms": round(cuts[98], 3),
+        "max_ms": round(max(samples), 3),
+        "throughput_per_s": round(iterations / elapsed, 1),
+    }
+
+
+def crud_cases(db, size: int, seed: int) -> List[tuple]:
+    # Spread lookups across the id range so caches do not flatter large databases
+    pick = lambda i: (i * 7919) % size + 1
+    skill = generate_profile(size // 2, seed).skills[-1]
+    new = lambda i: generate_profile(size + 1_000_000 + i, seed)
+    emails = list(db.scalars(select(Profile.email).where(Profile.id.in_([pick(i) for i in range(100)]))))
+    created: List[int] = []
+
+    def create(i):
+        created.append(crud.create_profile(db, new(i)).id)
+
+    # The first (warm-up) call loads the similarity matrix, so these measure queries only
+    similarity_cases = [
+        ("get_similar_profiles", lambda i: crud.get_similar_profiles(db, pick(i))),
+        ("get_similar_profiles:jaccard", lambda i: crud.get_similar_profiles(db, pick(i), metric="jaccard")),
+        ("get_related_skills", lambda i: crud.get_related_skills(db, skill)),
+    ] if similarity.AVAILABLE else []
+
+    return similarity_cases + [
+        ("get_profile", lambda i: crud.get_profile(db, pick(i))),
+        ("get_profile_by_email", lambda i: crud.get_profile_by_email(db, emails[i % len(emails)])),
+        ("get_profiles_by_ids", lambda i: crud.get_profiles_by_ids(db, [pick(i + n) for n in range(20)])),
+        ("get_profiles", lambda i: crud.get_profiles(db, skip=pick(i) % max(size - 100, 1), limit=100)),
+        ("get_profiles_page", lambda i: crud.get_profiles_page(db, cursor=encode_cursor(pick(i)), limit=100)),
+        ("get_profile_summaries_page", lambda i: crud.get_profile_summaries_page(db, cursor=encode_cursor(pick(i)), limit=100)),
+        ("get_profile_summaries_page:projects_count", lambda i: crud.get_profile_summaries_page(db, limit=100, sort="projects_count", descending=True)),
+        ("get_projects_by_skill", lambda i: crud.get_projects_by_skill(db, skill)),
+        ("get_top_skills", lambda i: crud.get_top_skills(db)),
+        ("search_profiles", lambda i: crud.search_profiles(db, "python", limit=100)),
+        ("search_profiles_page", lambda i: crud.search_profiles_page(db, "engineer", limit=100)),
+        ("search_facets", lambda i: crud.search_facets(db, "python")),
+        ("read_model.list_documents", lambda i: read_model.list_documents(db, cursor=encode_cursor(pick(i)), limit=100)),
+        ("create_profile", create),
+        ("update_profile", lambda i: crud.update_profile(db, created[i % len(created)], ProfileUpdate(description=f"Updated {i}"))),
+        ("create_project", lambda i: crud.create_project(db, created[i % len(created)], ProjectCreate(title="Bench", description="Bench"))),
+        ("delete_profile", lambda i: crud.delete_profile(db, created.pop())),
+    ]
+
+
+def http_cases(session_factory, size: int) -> List[tuple]:
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.database import get_db
+    from app.routers import bulk as bulk_router, diagnostics, directory, metrics
+
+    app = FastAPI()
+    for router in (directory.router, bulk_router.router, diagnostics.router):
+        app.include_router(router, prefix="/api/v1")
+    app.include_router(metrics.router)
+
+    def get_db_override():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_db_override
+    client = TestClient(app)
+    pick = lambda i: (i * 7919) % size + 1
+
+    def get(path: Callable[[int], str]):
+        def call(i):
+            client.get(path(i)).raise_for_status()
+        return call
+
+    return [
+        ("GET /profiles/{id}", get(lambda i: f"/api/v1/profiles/{pick(i)}")),
+        ("GET /profiles/{id}?fields", get(lambda i: f"/api/v1/profiles/{pick(i)}?fields=name,email&include=")),
+        ("GET /profiles/page", get(lambda i: f"/api/v1/profiles/page?cursor={encode_cursor(pick(i))}")),
+        ("GET /profiles/documents", get(lambda i: f"/api/v1/profiles/documents?cursor={encode_cursor(pick(i))}")),
+        ("GET /profiles/summaries", get(lambda i: "/api/v1/profiles/summaries?sort=skills_count&order=desc")),
+        ("GET /profiles/batch", get(lambda i: "/api/v1/profiles/batch?ids=" + ",".join(str(pick(i + n)) for n in range(20)))),
+        ("GET /search/page", get(lambda i: "/api/v1/search/page?q=python")),
+        ("GET /search/faceted", get(lambda i: "/api/v1/search/faceted?q=python")),
+        ("GET /projects/page", get(lambda i: "/api/v1/projects/page?skill=cloud")),
+        *([("GET /profiles/{id}/similar", get(lambda i: f"/api/v1/profiles/{pick(i)}/similar"))] if similarity.AVAILABLE else []),
+        ("GET /health/pool", get(lambda i: "/api/v1/health/pool")),
+        ("GET /metrics", get(lambda i: "/metrics")),
+    ]
+
+
+def run_size(url: str, size: int, seed: int, iterations: int, workers) -> dict:
+    start = time.perf_counter()
+    seed_profiles(url, size, seed=seed, workers=workers)
+    seed_seconds = time.perf_counter() - start
+
+    engine = create_engine(url)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    db = session_factory()
+    operations = []
+    for name, fn in crud_cases(db, size, seed):
+        operations.append(measure(name, "crud", fn, iterations))
+        db.expunge_all()
+    for name, fn in http_cases(session_factory, size):
+        operations.append(measure(name, "http", fn, iterations))
+    profiles = db.scalar(select(func.count()).select_from(Profile))
+    db.close()
+    engine.dispose()
+
+    return {
+        "size": size,
+        "profiles": profiles,
+        "seed_seconds": round(seed_seconds, 2),
+        # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 if sys.platform != "darwin" else 1024 ** 2), 1),
+        "operations": operations,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Comma-separated profile counts")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="Seeding processes (SQLite always uses one)")
+    parser.add_argument("--database-url", help="Empty database to use for every size (default: temporary SQLite)")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--run-size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_size is not None:
+        json.dump(run_size(args.database_url, args.run_size, args.seed, args.iterations, args.workers), sys.stdout)
+        return
+
+    results = []
+    for size in (int(value) for value in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            command = [
+                sys.executable, "-m", "app.benchmarks.bench_suite", "--run-size", str(size), "--database-url", url,
+                "--iterations", str(args.iterations), "--seed", str(args.seed),
+            ] + (["--workers", str(args.workers)] if args.workers else [])
+            env = dict(os.environ, DATABASE_URL=url)
+            result = json.loads(subprocess.run(command, stdout=subprocess.PIPE, text=True, check=True, env=env).stdout)
+        results.append(result)
+        slowest = max(result["operations"], key=lambda op: op["p99_ms"])
+        print(f"{size:>9} profiles: seeded in {result['seed_seconds']}s, peak RSS {result['peak_rss_mb']} MB, "
+              f"slowest p99 {slowest['name']} {slowest['p99_ms']} ms")
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": "sqlite" if not args.database_url else args.database_url.split(":", 1)[0],
+        "iterations": args.iterations,
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import csv
+import io
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Iterable, Iterator, List, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app import crud, read_model, search, similarity
+from app.cache import PROFILES_TAG, SKILLS_TAG, invalidate_after_commit
+from app.documents import dumps, format_datetime, iter_documents
+from app.models import Profile, Skill, Project, WorkExperience, profile_skills
+from app.schemas import ImportRecordError, ImportReport, ProfileCreate
+
+DEFAULT_CHUNK_SIZE = 1000
+# Bounds what a client may ask for, since a whole chunk is held in memory at once
+MAX_CHUNK_SIZE = 10000
+# Only the first errors are kept in the report so memory stays flat on badly broken files
+MAX_REPORTED_ERRORS = 1000
+
+Line = Union[str, bytes]
+
+
+def chunked(lines: Iterable[Line], size: int) -> Iterator[List[Tuple[int, Line]]]:
+    chunk = []
+    for number, line in enumerate(lines, start=1):
+        chunk.append((number, line))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_profiles(db: Session, lines: Iterable[Line], chunk_size: int = DEFAULT_CHUNK_SIZE) -> ImportReport:
+    """Import NDJSON ProfileCreate documents, committing one chunk at a time"""
+    report = ImportReport()
+    for chunk in chunked(lines, chunk_size):
+        import_chunk(db, chunk, report)
+    return report
+
+
+def import_chunk(db: Session, records: List[Tuple[int, Line]], report: ImportReport):
+    """Validate and insert one chunk of (line number, raw JSON) records, recording per-record errors"""
+    valid: List[Tuple[int, ProfileCreate]] = []
+    seen_emails = set()
+    for number, raw in records:
+        if not raw.strip():
+            continue
+        try:
+            profile = ProfileCreate.model_validate_json(raw)
+        except ValidationError as e:
+            _fail(report, number, "; ".join(f"{'.'.join(map(str, err['loc'])) or 'document'}: {err['msg']}" for err in e.errors()))
+            continue
+        too_long = _length_errors(profile)
+        if too_long:
+            _fail(report, number, "; ".join(too_long))
+            continue
+        if profile.email in seen_emails:
+            _fail(report, number, f"Duplicate email in import: {profile.email}")
+            continue
+        seen_emails.add(profile.email)
+        valid.append((number, profile))
+
+    existing = set(db.execute(select(Profile.email).where(Profile.email.in_(seen_emails))).scalars()) if seen_emails else set()
+    for number, profile in valid:
+        if profile.email in existing:
+            _fail(report, number, f"Profile with email {profile.email} already exists")
+    valid = [(number, profile) for number, profile in valid if profile.email not in existing]
+    if not valid:
+        return
+
+    try:
+        _insert_profiles(db, [profile for _, profile in valid])
+        db.commit()
+        report.imported += len(valid)
+    except DBAPIError as e:
+        # A concurrent writer got in first, or a value the database rejects slipped past
+        # validation; retry record by record to pin down the culprit
+        db.rollback()
+        if e.connection_invalidated:
+            raise
+        for number, profile in valid:
+            try:
+                _insert_profiles(db, [profile])
+                db.commit()
+                report.imported += 1
+            except DBAPIError as e:
+                db.rollback()
+                if e.connection_invalidated:
+                    raise
+                _fail(report, number, str(e.orig))
+
+
+def _length_errors(profile: ProfileCreate) -> List[str]:
+    """Values longer than their VARCHAR column, which PostgreSQL rejects for the whole INSERT or COPY"""
+    records = [(Profile.__table__, "", profile.model_dump(exclude={"skills", "projects", "work_experiences"}))]
+    records += [(Skill.__table__, f"skills.{index}.", {"name": name}) for index, name in enumerate(profile.skills)]
+    records += [(Project.__table__, f"projects.{index}.", project.model_dump()) for index, project in enumerate(profile.projects)]
+    records += [
+        (WorkExperience.__table__, f"work_experiences.{index}.", work.model_dump())
+        for index, work in enumerate(profile.work_experiences)
+    ]
+    errors = []
+    for table, prefix, values in records:
+        for column in table.columns:
+            length = getattr(column.type, "length", None)
+            value = values.get(column.name)
+            if length and isinstance(value, str) and len(value) > length:
+                errors.append(f"{prefix}{column.name}: String should have at most {length} characters")
+    return errors
+
+
+def _fail(report: ImportReport, line: int, error: str):
+    report.failed += 1
+    if len(report.errors) < MAX_REPORTED_ERRORS:
+        report.errors.append(ImportRecordError(line=line, error=error))
+
+
+def _insert_profiles(db: Session, profiles: List[ProfileCreate]):
+    rows = [profile.model_dump(exclude={"skills", "projects", "work_experiences"}) for profile in profiles]
+    inserted = db.execute(
+        insert(Profile).returning(Profile.id, Profile.email, sort_by_parameter_order=True),
+        rows
+    ).all()
+    profile_ids = {email: profile_id for profile_id, email in inserted}
+
+    skill_ids = crud.resolve_skill_ids(db, [name for profile in profiles for name in profile.skills])
+    links, projects, works = [], [], []
+    for profile in profiles:
+        profile_id = profile_ids[profile.email]
+        links.extend((profile_id, skill_ids[name]) for name in dict.fromkeys(profile.skills))
+        projects.extend((p.title, p.description, p.links, profile_id) for p in profile.projects)
+        works.extend(
+            (w.company, w.position, w.description, w.start_date, w.end_date, profile_id)
+            for w in profile.work_experiences
+        )
+
+    copy_rows(db, profile_skills, ["profile_id", "skill_id"], links)
+    copy_rows(db, Project.__table__, ["title", "description", "links", "profile_id"], projects)
+    copy_rows(db, WorkExperience.__table__, ["company", "position", "description", "start_date", "end_date", "profile_id"], works)
+
+    crud.adjust_skill_counts(db, Counter(skill_id for _, skill_id in links))
+    skill_sets = defaultdict(set)
+    for profile_id, skill_id in links:
+        skill_sets[profile_id].add(skill_id)
+    similarity.stage(db, skill_sets)
+    search.index_profiles(db, profile_ids.values())
+    read_model.refresh_documents(db, profile_ids.values())
+    invalidate_after_commit(db, PROFILES_TAG, SKILLS_TAG)
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    text = value.isoformat() if isinstance(value, datetime) else str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def copy_rows(db: Session, table, columns: List[str], rows: List[tuple]):
+    """Bulk-load rows with COPY on PostgreSQL, or a multi-row INSERT elsewhere"""
+    if not rows:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_value(value) for value in row))
+            buffer.write("\n")
+        buffer.seek(0)
+        cursor = db.connection().connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", buffer)
+        finally:
+            cursor.close()
+    else:
+        db.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CSV_COLUMNS = [
+    "id", "name", "email", "description", "github_url", "linkedin_url", "portfolio_url",
+    "version", "created_at", "updated_at", "skills", "projects", "work_experiences"
+]
+
+
+def export_profiles(db: Session, format: str = "ndjson", batch_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Yield every profile as NDJSON lines or CSV rows without materialising the table"""
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {format}")
+    documents = iter_documents(db, batch_size=batch_size)
+    if format == "ndjson":
+        for document in documents:
+            yield dumps(document) + "\n"
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for document in documents:
+        writer.writerow([
+            *(format_datetime(document[column]) if isinstance(document[column], datetime) else document[column] for column in CSV_COLUMNS[:-3]),
+            ";".join(skill["name"] for skill in document["skills"]),
+            dumps(document["projects"]),
+            dumps(document["work_experiences"])
+        ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
@@ -0,0 +1,212 @@
+"""Read-through cache for serialized read results, invalidated by tag after writes commit.
+
+Entries are JSON-ready documents (never ORM objects) keyed by function and arguments. Each
+entry remembers the version of every tag it depends on at the time it was loaded; writes
+bump those versions once their transaction commits, so a later lookup sees the mismatch and
+reloads. Snapshotting versions before loading means a read racing a write can at worst
+cache a value that is immediately treated as stale.
+
+The in-process LRU is always used. When CACHE_URL points at Redis the tag versions and the
+entries are also kept there, so invalidations reach every worker process.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.documents import dumps
+from app.singleflight import SingleFlight
+
+PROFILES_TAG = "profiles"
+SKILLS_TAG = "skills"
+_PENDING_KEY = "cache_invalidations"
+_MISSING = object()
+
+
+def profile_tag(profile_id: int) -> str:
+    return f"profile:{profile_id}"
+
+
+class LRUCache:
+    """Thread-safe mapping with a per-entry TTL and least-recently-used eviction beyond max_entries"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisCacheBackend:
+    """Shared entries and tag versions in Redis; requires the optional redis package"""
+
+    def __init__(self, url: str, prefix: str = "me-api:cache:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("CACHE_URL requires the redis package: pip install redis") from e
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: str, ttl: float):
+        self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    def versions(self, tags: List[str]) -> Tuple[int, ...]:
+        return tuple(int(v or 0) for v in self.client.mget([self.prefix + "tag:" + tag for tag in tags]))
+
+    def bump(self, tags: Iterable[str], ttl: float):
+        # Tag versions outlive every entry that could have snapshotted them, then expire
+        pipe = self.client.pipeline()
+        for tag in tags:
+            pipe.incr(self.prefix + "tag:" + tag)
+            pipe.pexpire(self.prefix + "tag:" + tag, int(ttl * 2000))
+        pipe.execute()
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 10000, ttl: float = 60.0, backend: Optional[RedisCacheBackend] = None, enabled: bool = True, flights: Optional[SingleFlight] = None):
+        self.enabled = enabled
+        self.flights = flights or SingleFlight(enabled=False)
+        self.ttl = ttl
+        self.local = LRUCache(max_entries, ttl)
+        self.backend = backend
+        self._lock = threading.Lock()
+        # Local tag versions are bounded too; forgetting a tag raises the floor every unknown
+        # tag reports, which can only turn entries stale, never resurrect them
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+        self._max_tags = max_entries
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _tag_versions(self, tags: List[str]) -> Tuple[int, ...]:
+        if self.backend is not None:
+            return self.backend.versions(tags)
+        with self._lock:
+            return tuple(self._versions.get(tag, self._floor) for tag in tags)
+
+    def get_or_load(self, key: str, tags: List[str], loader: Callable[[], Any]) -> Any:
+        if not (self.enabled or self.flights.enabled):
+            return loader()
+        versions = self._tag_versions(tags)
+        # Tag versions are part of the flight key, so a call that starts after an
+        # invalidation never joins a load that began before it
+        flight_key = f"{key}@{','.join(map(str, versions))}"
+        if not self.enabled:
+            return self.flights.do(flight_key, loader)
+        entry = self.local.get(key)
+        if entry is not _MISSING and entry[0] == versions:
+            self.hits += 1
+            return entry[1]
+        if self.backend is not None:
+            raw = self.backend.get(key)
+            if raw is not None:
+                stored_versions, value = json.loads(raw)
+                if tuple(stored_versions) == versions:
+                    self.local.set(key, (versions, value))
+                    self.hits += 1
+                    return value
+
+        self.misses += 1
+        value = self.flights.do(flight_key, loader)
+        # Misses for absent rows are not cached: a later insert carries no tag for them
+        if value is not None:
+            self.local.set(key, (versions, value))
+            if self.backend is not None:
+                self.backend.set(key, dumps([versions, value]), self.ttl)
+        return value
+
+    def invalidate(self, tags: Iterable[str]):
+        tags = set(tags)
+        self.invalidations += len(tags)
+        if self.backend is not None:
+            self.backend.bump(tags, self.ttl)
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.pop(tag, self._floor) + 1
+            while len(self._versions) > self._max_tags:
+                _, forgotten = self._versions.popitem(last=False)
+                self._floor = max(self._floor, forgotten + 1)
+
+    def clear(self):
+        self.local.clear()
+        self.invalidate([PROFILES_TAG, SKILLS_TAG])
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "backend": "redis" if self.backend is not None else "local",
+            "entries": len(self.local),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.local.evictions,
+            "expirations": self.local.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+response_cache = ResponseCache(
+    max_entries=settings.cache_max_entries,
+    ttl=settings.cache_ttl_seconds,
+    backend=RedisCacheBackend(settings.cache_url) if settings.cache_url else None,
+    enabled=settings.cache_enabled,
+    # Waiting followers block their thread, which under DATABASE_MODE=async is the event loop
+    # the leader needs to finish, so async mode caches without coalescing
+    flights=SingleFlight(enabled=settings.singleflight_enabled and settings.database_mode != "async"),
+)
+
+
+def invalidate_after_commit(db: Session, *tags: str):
+    """Queue tags to invalidate once the session's current transaction commits"""
+    db.info.setdefault(_PENDING_KEY, set()).update(tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session):
+    tags = session.info.pop(_PENDING_KEY, None)
+    if tags:
+        response_cache.invalidate(tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session):
+    session.info.pop(_PENDING_KEY, None)
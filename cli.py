@@ -0,0 +1,124 @@
+"""Maintenance commands, run from the directory containing the app package:
+
+    python -m app.cli rebuild-search-index
+    python -m app.cli reconcile-skill-counts [--dry-run]
+    python -m app.cli import-profiles profiles.ndjson
+    python -m app.cli export-profiles --format csv --output profiles.csv
+    python -m app.cli rebuild-read-model
+    python -m app.cli check-read-model
+"""
+import argparse
+import sys
+
+from app import bulk, crud, read_model, search
+from app.database import SessionLocal
+from app.replicas import use_primary
+
+
+def rebuild_search_index(args):
+    db = use_primary(SessionLocal())
+    try:
+        count = search.rebuild_index(db)
+        if count is None:
+            print("Full-text search is not supported on this database; nothing to rebuild")
+        else:
+            print(f"Rebuilt search index for {count} profiles")
+    finally:
+        db.close()
+
+
+def reconcile_skill_counts(args):
+    db = use_primary(SessionLocal())
+    try:
+        drift = crud.reconcile_skill_counts(db, fix=not args.dry_run)
+        for entry in drift:
+            print(f"{entry['skill']}: stored {entry['stored']}, actual {entry['actual']}")
+        action = "found" if args.dry_run else "repaired"
+        print(f"{len(drift)} skill counters {action}")
+    finally:
+        db.close()
+
+
+def import_profiles(args):
+    db = use_primary(SessionLocal())
+    source = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    try:
+        report = bulk.import_profiles(db, source, chunk_size=args.chunk_size)
+        for error in report.errors:
+            print(f"line {error.line}: {error.error}", file=sys.stderr)
+        print(f"Imported {report.imported} profiles, {report.failed} failed")
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        db.close()
+
+
+def export_profiles(args):
+    db = SessionLocal()
+    target = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    try:
+        for chunk in bulk.export_profiles(db, args.format):
+            target.write(chunk)
+    finally:
+        if target is not sys.stdout:
+            target.close()
+        db.close()
+
+
+def rebuild_read_model(args):
+    db = use_primary(SessionLocal())
+    try:
+        count = read_model.rebuild(db, batch_size=args.batch_size)
+        print(f"Rendered read model documents for {count} profiles")
+    finally:
+        db.close()
+
+
+def check_read_model(args):
+    db = SessionLocal()
+    try:
+        report = read_model.check_consistency(db, batch_size=args.batch_size)
+        for kind in ("missing", "stale", "orphaned"):
+            if report[kind]:
+                print(f"{kind}: {', '.join(str(profile_id) for profile_id in report[kind])}")
+        print(f"Checked {report['checked']} profiles: {'consistent' if report['consistent'] else 'inconsistent'}")
+    finally:
+        db.close()
+    if not report["consistent"]:
+        sys.exit(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Candidate profile API maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("rebuild-search-index", help="Rebuild full-text search documents for every profile").set_defaults(func=rebuild_search_index)
+
+    reconcile = commands.add_parser("reconcile-skill-counts", help="Recount profiles per skill and repair drifted counters")
+    reconcile.add_argument("--dry-run", action="store_true", help="Report drift without repairing it")
+    reconcile.set_defaults(func=reconcile_skill_counts)
+
+    importer = commands.add_parser("import-profiles", help="Bulk import newline-delimited ProfileCreate JSON")
+    importer.add_argument("path", help="NDJSON file to import, or - for stdin")
+    importer.add_argument("--chunk-size", type=int, default=bulk.DEFAULT_CHUNK_SIZE)
+    importer.set_defaults(func=import_profiles)
+
+    exporter = commands.add_parser("export-profiles", help="Stream every profile as NDJSON or CSV")
+    exporter.add_argument("--format", choices=sorted(bulk.EXPORT_FORMATS), default="ndjson")
+    exporter.add_argument("--output", default="-", help="File to write, or - for stdout")
+    exporter.set_defaults(func=export_profiles)
+
+    rebuild = commands.add_parser("rebuild-read-model", help="Re-render the profile_documents read model for every profile")
+    rebuild.add_argument("--batch-size", type=int, default=1000)
+    rebuild.set_defaults(func=rebuild_read_model)
+
+    check = commands.add_parser("check-read-model", help="Compare the read model with live data; exits 1 on drift")
+    check.add_argument("--batch-size", type=int, default=1000)
+    check.set_defaults(func=check_read_model)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
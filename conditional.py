@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request
+
+
+def profile_etag(profile_id: int, version: int) -> str:
+    return f'"profile-{profile_id}-v{version}"'
+
+
+def parse_profile_etag(etag: str, profile_id: int) -> Optional[int]:
+    """Return the version encoded in one of our strong ETags, or None if it is not one"""
+    prefix = f'"profile-{profile_id}-v'
+    if etag.startswith(prefix) and etag.endswith('"'):
+        version = etag[len(prefix):-1]
+        if version.isdigit():
+            return int(version)
+    return None
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive CURRENT_TIMESTAMP values, which are UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since only when it is absent (RFC 9110)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison: W/ prefixes added by intermediaries still match
+        return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates carry whole seconds only
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def expected_version(request: Request, profile_id: int, current_version: int) -> Optional[int]:
+    """Translate If-Match into the version an update must find, or raise ValueError if it cannot match"""
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return None
+    candidates = [tag.strip() for tag in if_match.split(",")]
+    if "*" in candidates:
+        return None
+    versions = {parse_profile_etag(tag, profile_id) for tag in candidates} - {None}
+    if current_version in versions:
+        return current_version
+    raise ValueError("Profile has been modified since the supplied ETag")
@@ -1,30 +1,188 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_
-from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload, load_only, raiseload, selectinload, subqueryload
+from sqlalchemy import String, and_, case, or_, exists, literal, select, insert, union_all, update, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import Dict, List, Optional, Set, Tuple
+from datetime import datetime
 import json
 
-from app.models import Profile, Skill, Project, WorkExperience
+from app import read_model, search, similarity
+from app.cache import PROFILES_TAG, SKILLS_TAG, invalidate_after_commit, profile_tag
+from app.config import settings
+from app.fieldsets import PROFILE_FIELDS, RELATIONSHIP_FIELDS, Fieldset
+from app.models import Profile, Skill, Project, WorkExperience, profile_skills
+from app.pagination import encode_cursor, decode_cursor
+from app.skill_lookup import skill_lookup
 from app.schemas import ProfileCreate, ProfileUpdate, ProjectCreate, ProjectUpdate, WorkExperienceCreate, WorkExperienceUpdate
 
 
-def get_profile(db: Session, profile_id: int) -> Optional[Profile]:
+# Collection loaders selectable per call; "selectin" issues one batched IN query per
+# collection, while "joined" fetches the skills x projects x experiences product in one query
+LOADING_STRATEGIES = {
+    "selectin": selectinload,
+    "subquery": subqueryload,
+    "joined": joinedload,
+}
+
+
+def profile_load_options(strategy: Optional[str] = None, fieldset: Optional[Fieldset] = None) -> list:
+    loader = LOADING_STRATEGIES.get(strategy or settings.profile_loading_strategy)
+    if loader is None:
+        raise ValueError(f"Unknown loading strategy: {strategy}")
+    if fieldset is None:
+        return [
+            loader(Profile.skills),
+            loader(Profile.projects),
+            loader(Profile.work_experiences)
+        ]
+
+    options = []
+    if fieldset.columns is not None:
+        options.append(load_only(*(PROFILE_FIELDS[name] for name in fieldset.columns)))
+    for name, columns in RELATIONSHIP_FIELDS.items():
+        relationship = getattr(Profile, name)
+        if name not in fieldset.relationships:
+            # Collections left out of the fieldset must never be fetched, not even lazily
+            options.append(raiseload(relationship))
+            continue
+        option = loader(relationship)
+        if fieldset.relationships[name] is not None:
+            option = option.load_only(*(columns[column] for column in fieldset.relationships[name]))
+        options.append(option)
+    return options
+
+
+def get_profile(db: Session, profile_id: int, strategy: Optional[str] = None, fieldset: Optional[Fieldset] = None) -> Optional[Profile]:
     return db.query(Profile).options(
-        joinedload(Profile.skills),
-        joinedload(Profile.projects),
-        joinedload(Profile.work_experiences)
+        *profile_load_options(strategy, fieldset)
     ).filter(Profile.id == profile_id).first()
 
 
+def get_profiles_by_ids(db: Session, profile_ids: List[int], strategy: Optional[str] = None, fieldset: Optional[Fieldset] = None) -> List[Profile]:
+    """Fetch profiles with one IN query plus one batched query per collection, in the order given"""
+    ids = list(dict.fromkeys(profile_ids))
+    if not ids:
+        return []
+    profiles = {
+        profile.id: profile
+        for profile in db.query(Profile).options(*profile_load_options(strategy, fieldset)).filter(Profile.id.in_(ids))
+    }
+    return [profiles[profile_id] for profile_id in ids if profile_id in profiles]
+
+
+def profile_exists(db: Session, profile_id: int) -> bool:
+    """Check existence with an EXISTS probe instead of loading the profile"""
+    return bool(db.scalar(select(exists().where(Profile.id == profile_id))))
+
+
+def get_profile_version(db: Session, profile_id: int) -> Optional[Tuple[int, datetime]]:
+    """Return (version, updated_at) without loading any collections"""
+    row = db.query(Profile.version, Profile.updated_at).filter(Profile.id == profile_id).first()
+    return tuple(row) if row else None
+
+
+class VersionConflict(Exception):
+    """Raised when a conditional write finds the profile at a different version"""
+
+
+def touch_profile(db: Session, profile_id: int, expected_version: Optional[int] = None):
+    """Bump the profile version and updated_at, optionally only if it is still at expected_version.
+
+    The compare-and-set happens in a single UPDATE, whose row lock is held until commit,
+    so two writers holding the same version cannot both succeed.
+    """
+    statement = update(Profile).where(Profile.id == profile_id)
+    if expected_version is not None:
+        statement = statement.where(Profile.version == expected_version)
+    result = db.execute(
+        statement.values(version=Profile.version + 1, updated_at=func.now()),
+        execution_options={"synchronize_session": False}
+    )
+    if result.rowcount == 0 and expected_version is not None:
+        raise VersionConflict(f"Profile {profile_id} is no longer at version {expected_version}")
+
+
+def _reload_profile(db: Session, profile_id: int) -> Optional[Profile]:
+    # populate_existing refreshes objects already in the identity map, which sessions
+    # created with expire_on_commit=False would otherwise return unchanged
+    return db.query(Profile).options(
+        *profile_load_options()
+    ).filter(Profile.id == profile_id).populate_existing().first()
+
+
 def get_profile_by_email(db: Session, email: str) -> Optional[Profile]:
     return db.query(Profile).filter(Profile.email == email).first()
 
 
-def get_profiles(db: Session, skip: int = 0, limit: int = 100) -> List[Profile]:
+def get_profiles(db: Session, skip: int = 0, limit: int = 100, strategy: Optional[str] = None, fieldset: Optional[Fieldset] = None) -> List[Profile]:
     return db.query(Profile).options(
-        joinedload(Profile.skills),
-        joinedload(Profile.projects),
-        joinedload(Profile.work_experiences)
-    ).offset(skip).limit(limit).all()
+        *profile_load_options(strategy, fieldset)
+    ).order_by(Profile.id).offset(skip).limit(limit).all()
+
+
+def _keyset_page(query, cursor: Optional[str], limit: int) -> Tuple[List[Profile], Optional[str]]:
+    # Seek past the last id of the previous page instead of counting rows with OFFSET,
+    # so every page costs one index range scan regardless of its depth
+    if cursor:
+        last_id, = decode_cursor(cursor)
+        query = query.filter(Profile.id > int(last_id))
+    rows = query.order_by(Profile.id).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def get_profiles_page(db: Session, cursor: Optional[str] = None, limit: int = 100, strategy: Optional[str] = None, fieldset: Optional[Fieldset] = None) -> Tuple[List[Profile], Optional[str]]:
+    query = db.query(Profile).options(
+        *profile_load_options(strategy, fieldset)
+    )
+    return _keyset_page(query, cursor, limit)
+
+
+def _insert_ignoring_conflicts(db: Session, target, index_elements: List[str]):
+    # INSERT ... ON CONFLICT DO NOTHING, so concurrent writers adding the same row both succeed
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(target).on_conflict_do_nothing(index_elements=index_elements)
+    if dialect == "sqlite":
+        return sqlite.insert(target).on_conflict_do_nothing(index_elements=index_elements)
+    return insert(target)
+
+
+def resolve_skill_ids(db: Session, names: List[str]) -> Dict[str, int]:
+    """Map skill names to ids, creating missing skills, in at most three statements"""
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    skill_ids = dict(db.execute(select(Skill.name, Skill.id).where(Skill.name.in_(names))).all())
+    missing = [name for name in names if name not in skill_ids]
+    if missing:
+        # Sorted, so concurrent writers creating overlapping names wait on each other in the same order
+        db.execute(_insert_ignoring_conflicts(db, Skill, ["name"]).values([{"name": name} for name in sorted(missing)]))
+        # Re-select rather than trusting RETURNING: rows inserted by a concurrent writer are skipped above
+        skill_ids.update(db.execute(select(Skill.name, Skill.id).where(Skill.name.in_(missing))).all())
+    return skill_ids
+
+
+def _set_profile_skills(db: Session, profile_id: int, names: List[str], current_ids: Set[int]):
+    # Apply only the difference to profile_skills; unchanged links are left untouched
+    wanted_ids = set(resolve_skill_ids(db, names).values())
+    added, removed = wanted_ids - current_ids, current_ids - wanted_ids
+    # current_ids may already be stale when a concurrent update of the same profile commits
+    # first, so conflicting links are skipped and the counters only follow the rows each
+    # statement actually changed
+    if added:
+        added = set(db.execute(
+            _insert_ignoring_conflicts(db, profile_skills, ["profile_id", "skill_id"])
+            .values([{"profile_id": profile_id, "skill_id": skill_id} for skill_id in sorted(added)])
+            .returning(profile_skills.c.skill_id)
+        ).scalars())
+    if removed:
+        removed = set(db.execute(delete(profile_skills).where(
+            profile_skills.c.profile_id == profile_id,
+            profile_skills.c.skill_id.in_(removed)
+        ).returning(profile_skills.c.skill_id)).scalars())
+    adjust_skill_counts(db, {**{skill_id: 1 for skill_id in added}, **{skill_id: -1 for skill_id in removed}})
+    if added or removed:
+        similarity.stage(db, {profile_id: wanted_ids})
 
 
 def create_profile(db: Session, profile: ProfileCreate) -> Profile:
@@ -39,16 +197,12 @@ def create_profile(db: Session, profile: ProfileCreate) -> Profile:
     )
     db.add(db_profile)
     db.flush()  # Get the ID without committing
+    # Kept apart from db_profile: reading it after commit would refresh the expired instance
+    profile_id = db_profile.id
     
     # Handle skills
     if profile.skills:
-        for skill_name in profile.skills:
-            skill = db.query(Skill).filter(Skill.name == skill_name).first()
-            if not skill:
-                skill = Skill(name=skill_name)
-                db.add(skill)
-                db.flush()
-            db_profile.skills.append(skill)
+        _set_profile_skills(db, db_profile.id, profile.skills, current_ids=set())
     
     # Handle projects
     if profile.projects:
@@ -74,37 +228,43 @@ def create_profile(db: Session, profile: ProfileCreate) -> Profile:
             )
             db.add(work)
     
+    search.index_profiles(db, [db_profile.id])
+    invalidate_after_commit(db, PROFILES_TAG, *([SKILLS_TAG] if profile.skills else []))
+    read_model.refresh_documents(db, [db_profile.id])
     db.commit()
-    db.refresh(db_profile)
-    return db_profile
+    # Reload with collections eagerly loaded so callers never trigger lazy loads
+    return _reload_profile(db, profile_id)
 
 
-def update_profile(db: Session, profile_id: int, profile_update: ProfileUpdate) -> Optional[Profile]:
+def update_profile(db: Session, profile_id: int, profile_update: ProfileUpdate, expected_version: Optional[int] = None) -> Optional[Profile]:
     db_profile = get_profile(db, profile_id)
     if not db_profile:
         return None
     
+    try:
+        touch_profile(db, profile_id, expected_version)
+    except VersionConflict:
+        db.rollback()
+        raise
+    
     # Update basic fields
     for field, value in profile_update.dict(exclude_unset=True, exclude={'skills'}).items():
         setattr(db_profile, field, value)
     
     # Handle skills update
     if profile_update.skills is not None:
-        # Clear existing skills
-        db_profile.skills.clear()
-        
-        # Add new skills
-        for skill_name in profile_update.skills:
-            skill = db.query(Skill).filter(Skill.name == skill_name).first()
-            if not skill:
-                skill = Skill(name=skill_name)
-                db.add(skill)
-                db.flush()
-            db_profile.skills.append(skill)
+        current_ids = {skill.id for skill in db_profile.skills}
+        _set_profile_skills(db, db_profile.id, profile_update.skills, current_ids)
+        # profile_skills was changed with Core statements; drop the stale loaded collection
+        db.expire(db_profile, ["skills"])
+        invalidate_after_commit(db, SKILLS_TAG)
     
+    search.index_profiles(db, [db_profile.id])
+    invalidate_after_commit(db, PROFILES_TAG, profile_tag(db_profile.id))
+    read_model.refresh_documents(db, [db_profile.id])
     db.commit()
-    db.refresh(db_profile)
-    return db_profile
+    # Reload with collections eagerly loaded so callers never trigger lazy loads
+    return _reload_profile(db, profile_id)
 
 
 def delete_profile(db: Session, profile_id: int) -> bool:
@@ -112,46 +272,265 @@ def delete_profile(db: Session, profile_id: int) -> bool:
     if not db_profile:
         return False
     
+    adjust_skill_counts(db, {skill.id: -1 for skill in db_profile.skills})
+    similarity.stage(db, {db_profile.id: set()})
+    search.remove_profiles(db, [db_profile.id])
+    read_model.remove_documents(db, [db_profile.id])
+    invalidate_after_commit(db, PROFILES_TAG, SKILLS_TAG, profile_tag(db_profile.id))
     db.delete(db_profile)
     db.commit()
     return True
 
 
-def get_projects_by_skill(db: Session, skill: str) -> List[Project]:
-    return db.query(Project).join(Profile).join(Profile.skills).filter(
-        Skill.name.ilike(f"%{skill}%")
-    ).all()
+def _projects_by_skill_query(db: Session, skill: str):
+    # Resolve the handful of matching skill ids first so the join starts from a small set
+    skill_ids = skill_lookup.match_ids(db, skill)
+    if not skill_ids:
+        return None
+    profile_ids = select(profile_skills.c.profile_id).where(profile_skills.c.skill_id.in_(skill_ids))
+    return db.query(Project).filter(Project.profile_id.in_(profile_ids)).order_by(Project.id)
+
+
+def get_projects_by_skill(db: Session, skill: str, skip: int = 0, limit: int = 100) -> List[Project]:
+    query = _projects_by_skill_query(db, skill)
+    if query is None:
+        return []
+    return query.offset(skip).limit(limit).all()
+
+
+def get_projects_by_skill_page(db: Session, skill: str, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Project], Optional[str]]:
+    query = _projects_by_skill_query(db, skill)
+    if query is None:
+        return [], None
+    if cursor:
+        last_id, = decode_cursor(cursor)
+        query = query.filter(Project.id > int(last_id))
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def adjust_skill_counts(db: Session, deltas: Dict[int, int]):
+    """Add per-skill deltas to profile_count in one relative UPDATE.
+
+    Relative, so concurrent writers never overwrite each other's increments. On PostgreSQL the
+    rows are first locked in skill id order, so writers touching overlapping skills queue up
+    instead of deadlocking.
+    """
+    deltas = {skill_id: delta for skill_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    skill_ids = sorted(deltas)
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(Skill.id).where(Skill.id.in_(skill_ids)).order_by(Skill.id).with_for_update())
+    db.execute(
+        update(Skill).where(Skill.id.in_(skill_ids)).values(
+            profile_count=Skill.profile_count + case(deltas, value=Skill.id, else_=0)
+        ),
+        execution_options={"synchronize_session": False}
+    )
 
 
 def get_top_skills(db: Session, limit: int = 10) -> List[dict]:
-    from sqlalchemy import func
-    result = db.query(
-        Skill.name,
-        func.count(Profile.id).label('count')
-    ).join(Profile.skills).group_by(Skill.name).order_by(
-        func.count(Profile.id).desc()
-    ).limit(limit).all()
+    result = db.query(Skill.name, Skill.profile_count).filter(
+        Skill.profile_count > 0
+    ).order_by(Skill.profile_count.desc(), Skill.name).limit(limit).all()
     
     return [{"skill": name, "count": count} for name, count in result]
 
 
-def search_profiles(db: Session, query: str, skip: int = 0, limit: int = 100) -> List[Profile]:
+def get_similar_profiles(db: Session, profile_id: int, limit: int = 10, metric: str = "cosine") -> List[dict]:
+    """Profiles whose skill sets are closest to profile_id's, ranked from the in-memory skill matrix"""
+    similarity.similarity_index.ensure_ready(db)
+    matches = similarity.similarity_index.similar_profiles(profile_id, limit, metric)
+    if not matches:
+        return []
+    names = dict(db.execute(select(Profile.id, Profile.name).where(Profile.id.in_([match[0] for match in matches]))).all())
+    # A profile deleted through another worker stays in the matrix until the next rebuild
+    return [
+        {"id": match_id, "name": names[match_id], "score": score, "shared_skills": shared}
+        for match_id, score, shared in matches if match_id in names
+    ]
+
+
+def get_related_skills(db: Session, skill: str, limit: int = 10, metric: str = "cosine") -> Optional[List[dict]]:
+    """Skills most often held together with the named skill, or None if there is no such skill"""
+    skill_id = db.execute(select(Skill.id).where(Skill.name == skill)).scalar()
+    if skill_id is None:
+        return None
+    similarity.similarity_index.ensure_ready(db)
+    matches = similarity.similarity_index.related_skills(skill_id, limit, metric)
+    if not matches:
+        return []
+    names = dict(db.execute(select(Skill.id, Skill.name).where(Skill.id.in_([match[0] for match in matches]))).all())
+    return [
+        {"skill": names[match_id], "score": score, "co_occurrences": shared}
+        for match_id, score, shared in matches if match_id in names
+    ]
+
+
+def reconcile_skill_counts(db: Session, fix: bool = True) -> List[dict]:
+    """Recount profiles per skill from profile_skills and report (and optionally repair) drift"""
+    actual = func.count(profile_skills.c.profile_id)
+    rows = db.query(Skill.id, Skill.name, Skill.profile_count, actual).outerjoin(
+        profile_skills, profile_skills.c.skill_id == Skill.id
+    ).group_by(Skill.id, Skill.name, Skill.profile_count).having(actual != Skill.profile_count).all()
+
+    drift = [{"skill": name, "stored": stored, "actual": count} for _, name, stored, count in rows]
+    if fix and rows:
+        for skill_id, _, _, count in rows:
+            db.execute(update(Skill).where(Skill.id == skill_id).values(profile_count=count))
+        db.commit()
+    return drift
+
+
+def _search_query(db: Session, query: str, strategy: Optional[str] = None, fieldset: Optional[Fieldset] = None):
+    base = db.query(Profile).options(
+        *profile_load_options(strategy, fieldset)
+    )
+    match = search.match_query(db, query)
+    if match is None:
+        # No full-text backend (or nothing to tokenize): fall back to substring matching
+        return base.filter(_substring_match(query)), None
+    match = match.subquery()
+    return base.join(match, match.c.profile_id == Profile.id), match.c.score
+
+
+def _substring_match(query: str):
     search_term = f"%{query}%"
-    return db.query(Profile).options(
-        joinedload(Profile.skills),
-        joinedload(Profile.projects),
-        joinedload(Profile.work_experiences)
-    ).filter(
-        or_(
-            Profile.name.ilike(search_term),
-            Profile.description.ilike(search_term),
-            Profile.skills.any(Skill.name.ilike(search_term))
-        )
-    ).offset(skip).limit(limit).all()
+    return or_(
+        Profile.name.ilike(search_term),
+        Profile.description.ilike(search_term),
+        Profile.skills.any(Skill.name.ilike(search_term))
+    )
+
+
+def search_profiles(db: Session, query: str, skip: int = 0, limit: int = 100, strategy: Optional[str] = None, fieldset: Optional[Fieldset] = None) -> List[Profile]:
+    results, score = _search_query(db, query, strategy, fieldset)
+    ordering = [Profile.id] if score is None else [score.desc(), Profile.id]
+    return results.order_by(*ordering).offset(skip).limit(limit).all()
+
+
+def search_profiles_page(db: Session, query: str, cursor: Optional[str] = None, limit: int = 100, strategy: Optional[str] = None, fieldset: Optional[Fieldset] = None) -> Tuple[List[Profile], Optional[str]]:
+    results, score = _search_query(db, query, strategy, fieldset)
+    if score is None:
+        return _keyset_page(results, cursor, limit)
+
+    # Ranked results page on (score desc, id) so ties keep a stable order
+    if cursor:
+        last_score, last_id = decode_cursor(cursor, size=2)
+        results = results.filter(or_(
+            score < float(last_score),
+            and_(score == float(last_score), Profile.id > int(last_id))
+        ))
+    rows = results.add_columns(score).order_by(score.desc(), Profile.id).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last_profile, last_score = rows[limit - 1]
+        next_cursor = encode_cursor(last_score, last_profile.id)
+    return [profile for profile, _ in rows[:limit]], next_cursor
+
+
+def search_facets(db: Session, query: str, facet_limit: int = 10, sample_size: Optional[int] = None) -> dict:
+    """Count skills and companies across the profiles matching a search, in one statement.
+
+    Counting is bounded: only the sample_size best matches are aggregated (sampled is true
+    when the result set was cut off there) and each facet keeps its facet_limit largest values.
+    """
+    sample_size = sample_size or settings.search_facet_sample_size
+    match = search.match_query(db, query)
+    if match is None:
+        match = select(Profile.id.label("profile_id")).where(_substring_match(query))
+        ranking = lambda columns: [columns.profile_id]
+    else:
+        ranking = lambda columns: [columns.score.desc(), columns.profile_id]
+    # One row past the sample tells a cut-off result set from one of exactly sample_size
+    # matches; only the first sample_size are aggregated
+    candidates = match.order_by(*ranking(match.selected_columns)).limit(sample_size + 1).cte("candidates")
+    matches = select(candidates).order_by(*ranking(candidates.c)).limit(sample_size).cte("matches")
+
+    def top(facet: str, ranked, value, count):
+        # Each facet is ranked and cut to facet_limit in its own subquery, so the UNION ALL
+        # returns at most 2 * facet_limit + 1 rows whatever the size of the result set
+        ranked = ranked.add_columns(
+            literal(facet).label("facet"), value.label("value"), count.label("count")
+        ).group_by(value).order_by(count.desc(), value).limit(facet_limit).subquery()
+        return select(ranked.c.facet, ranked.c.value, ranked.c["count"])
+
+    skills = top(
+        "skill",
+        select().select_from(matches)
+        .join(profile_skills, profile_skills.c.profile_id == matches.c.profile_id)
+        .join(Skill, Skill.id == profile_skills.c.skill_id),
+        Skill.name, func.count()
+    )
+    companies = top(
+        "company",
+        select().select_from(matches).join(WorkExperience, WorkExperience.profile_id == matches.c.profile_id),
+        WorkExperience.company, func.count(WorkExperience.profile_id.distinct())
+    )
+    total = select(literal("total").label("facet"), literal(None, String).label("value"), func.count().label("count")).select_from(candidates)
+
+    facets = {"skills": [], "companies": [], "total": 0}
+    for facet, value, count in db.execute(union_all(skills, companies, total)):
+        if facet == "total":
+            facets["total"] = count
+        else:
+            facets["skills" if facet == "skill" else "companies"].append({"value": value, "count": count})
+    for key in ("skills", "companies"):
+        facets[key].sort(key=lambda item: (-item["count"], item["value"]))
+    facets["sampled"] = facets["total"] > sample_size
+    facets["total"] = min(facets["total"], sample_size)
+    return facets
+
+
+SUMMARY_SORTS = ("id", "skills_count", "projects_count", "work_experiences_count")
+
+
+def _summary_query():
+    # Correlated COUNT subqueries aggregate each collection in the database, so a page of
+    # summaries is one statement that never transfers child rows
+    def count(table, profile_id):
+        return select(func.count()).select_from(table).where(profile_id == Profile.id).correlate(Profile).scalar_subquery()
+
+    return select(
+        Profile.id,
+        Profile.name,
+        Profile.email,
+        count(profile_skills, profile_skills.c.profile_id).label("skills_count"),
+        count(Project.__table__, Project.profile_id).label("projects_count"),
+        count(WorkExperience.__table__, WorkExperience.profile_id).label("work_experiences_count"),
+    ).subquery("summaries")
+
+
+def get_profile_summaries_page(db: Session, cursor: Optional[str] = None, limit: int = 100, sort: str = "id", descending: bool = False) -> Tuple[List[dict], Optional[str]]:
+    """Page through profiles with child counts, ordered by id or any count with id breaking ties"""
+    if sort not in SUMMARY_SORTS:
+        raise ValueError(f"Unknown sort: {sort}")
+    summaries = _summary_query()
+    key = summaries.c[sort]
+    query = select(summaries)
+    if cursor:
+        if sort == "id":
+            last_id, = decode_cursor(cursor)
+            query = query.where(key < int(last_id) if descending else key > int(last_id))
+        else:
+            last_count, last_id = decode_cursor(cursor, size=2)
+            past = key < int(last_count) if descending else key > int(last_count)
+            query = query.where(or_(past, and_(key == int(last_count), summaries.c.id > int(last_id))))
+    order = [key.desc() if descending else key]
+    if sort != "id":
+        order.append(summaries.c.id)
+    rows = db.execute(query.order_by(*order).limit(limit + 1)).mappings().all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last["id"]) if sort == "id" else encode_cursor(last[sort], last["id"])
+    return [dict(row) for row in rows[:limit]], next_cursor
 
 
 def create_project(db: Session, profile_id: int, project: ProjectCreate) -> Optional[Project]:
-    if not get_profile(db, profile_id):
+    if not profile_exists(db, profile_id):
         return None
     
     db_project = Project(
@@ -161,6 +540,9 @@ def create_project(db: Session, profile_id: int, project: ProjectCreate) -> Opti
         profile_id=profile_id
     )
     db.add(db_project)
+    touch_profile(db, profile_id)
+    invalidate_after_commit(db, PROFILES_TAG, profile_tag(profile_id))
+    read_model.refresh_documents(db, [profile_id])
     db.commit()
     db.refresh(db_project)
     return db_project
@@ -174,6 +556,9 @@ def update_project(db: Session, project_id: int, project_update: ProjectUpdate)
     for field, value in project_update.dict(exclude_unset=True).items():
         setattr(db_project, field, value)
     
+    touch_profile(db, db_project.profile_id)
+    invalidate_after_commit(db, PROFILES_TAG, profile_tag(db_project.profile_id))
+    read_model.refresh_documents(db, [db_project.profile_id])
     db.commit()
     db.refresh(db_project)
     return db_project
@@ -184,13 +569,16 @@ def delete_project(db: Session, project_id: int) -> bool:
     if not db_project:
         return False
     
+    touch_profile(db, db_project.profile_id)
+    invalidate_after_commit(db, PROFILES_TAG, profile_tag(db_project.profile_id))
     db.delete(db_project)
+    read_model.refresh_documents(db, [db_project.profile_id])
     db.commit()
     return True
 
 
 def create_work_experience(db: Session, profile_id: int, work: WorkExperienceCreate) -> Optional[WorkExperience]:
-    if not get_profile(db, profile_id):
+    if not profile_exists(db, profile_id):
         return None
     
     db_work = WorkExperience(
@@ -202,6 +590,9 @@ def create_work_experience(db: Session, profile_id: int, work: WorkExperienceCre
         profile_id=profile_id
     )
     db.add(db_work)
+    touch_profile(db, profile_id)
+    invalidate_after_commit(db, PROFILES_TAG, profile_tag(profile_id))
+    read_model.refresh_documents(db, [profile_id])
     db.commit()
     db.refresh(db_work)
     return db_work
@@ -215,6 +606,9 @@ def update_work_experience(db: Session, work_id: int, work_update: WorkExperienc
     for field, value in work_update.dict(exclude_unset=True).items():
         setattr(db_work, field, value)
     
+    touch_profile(db, db_work.profile_id)
+    invalidate_after_commit(db, PROFILES_TAG, profile_tag(db_work.profile_id))
+    read_model.refresh_documents(db, [db_work.profile_id])
     db.commit()
     db.refresh(db_work)
     return db_work
@@ -225,6 +619,9 @@ def delete_work_experience(db: Session, work_id: int) -> bool:
     if not db_work:
         return False
     
+    touch_profile(db, db_work.profile_id)
+    invalidate_after_commit(db, PROFILES_TAG, profile_tag(db_work.profile_id))
     db.delete(db_work)
+    read_model.refresh_documents(db, [db_work.profile_id])
     db.commit()
     return True
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""Async counterparts of the functions in app.crud.
+
+Each function takes an AsyncSession and runs the matching sync implementation through
+AsyncSession.run_sync, so queries go out over the async driver without blocking the event
+loop while the query logic stays in one place. Results are fully loaded before they are
+returned, so they can be serialized outside the session. run_sync does the same for any
+other function taking a session first (crud_cached, read_model).
+"""
+import functools
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+
+
+async def run_sync(db: AsyncSession, fn, *args, **kwargs):
+    return await db.run_sync(fn, *args, **kwargs)
+
+
+def _run_sync(fn):
+    @functools.wraps(fn)
+    async def wrapper(db: AsyncSession, *args, **kwargs):
+        return await run_sync(db, fn, *args, **kwargs)
+    return wrapper
+
+
+get_profile = _run_sync(crud.get_profile)
+get_profiles_by_ids = _run_sync(crud.get_profiles_by_ids)
+profile_exists = _run_sync(crud.profile_exists)
+get_profile_by_email = _run_sync(crud.get_profile_by_email)
+get_profiles = _run_sync(crud.get_profiles)
+get_profiles_page = _run_sync(crud.get_profiles_page)
+get_profile_summaries_page = _run_sync(crud.get_profile_summaries_page)
+create_profile = _run_sync(crud.create_profile)
+update_profile = _run_sync(crud.update_profile)
+delete_profile = _run_sync(crud.delete_profile)
+get_projects_by_skill = _run_sync(crud.get_projects_by_skill)
+get_projects_by_skill_page = _run_sync(crud.get_projects_by_skill_page)
+get_top_skills = _run_sync(crud.get_top_skills)
+get_similar_profiles = _run_sync(crud.get_similar_profiles)
+get_related_skills = _run_sync(crud.get_related_skills)
+search_profiles = _run_sync(crud.search_profiles)
+search_profiles_page = _run_sync(crud.search_profiles_page)
+search_facets = _run_sync(crud.search_facets)
+create_project = _run_sync(crud.create_project)
+update_project = _run_sync(crud.update_project)
+delete_project = _run_sync(crud.delete_project)
+create_work_experience = _run_sync(crud.create_work_experience)
+update_work_experience = _run_sync(crud.update_work_experience)
+delete_work_experience = _run_sync(crud.delete_work_experience)
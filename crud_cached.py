@@ -0,0 +1,72 @@
+"""Cached counterparts of the read functions in app.crud.
+
+Results are returned as documents shaped like the matching response schema (pages are built
+with documents.orm_document and encode through documents.dumps), so they can be shared
+between sessions, threads and (with CACHE_URL) worker processes. The write functions in
+app.crud invalidate the affected tags once their transaction commits.
+
+Entries may be filled from a lagging replica, so sessions that must read their own writes
+(see app.replicas) bypass both the cache and single-flight and query the primary directly.
+"""
+from typing import Any, Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.cache import PROFILES_TAG, SKILLS_TAG, profile_tag, response_cache
+from app.documents import orm_document
+from app.fieldsets import Fieldset
+from app.replicas import reads_own_writes
+from app.schemas import Profile
+
+
+def _get_or_load(db: Session, key: str, tags: List[str], loader: Callable[[], Any]) -> Any:
+    if reads_own_writes(db):
+        return loader()
+    return response_cache.get_or_load(key, tags, loader)
+
+
+def _documents(profiles) -> List[dict]:
+    return [Profile.model_validate(profile).model_dump(mode="json") for profile in profiles]
+
+
+def get_profile(db: Session, profile_id: int) -> Optional[dict]:
+    def load():
+        profile = crud.get_profile(db, profile_id)
+        return _documents([profile])[0] if profile else None
+    return _get_or_load(db, f"get_profile:{profile_id}", [profile_tag(profile_id)], load)
+
+
+def _page(profiles, next_cursor: Optional[str], fieldset: Optional[Fieldset]) -> dict:
+    return {"items": [orm_document(profile, fieldset) for profile in profiles], "next_cursor": next_cursor}
+
+
+def get_profiles_page(db: Session, cursor: Optional[str] = None, limit: int = 100, fieldset: Optional[Fieldset] = None) -> dict:
+    return _get_or_load(
+        db, f"get_profiles_page:{limit}:{cursor}:{fieldset!r}", [PROFILES_TAG],
+        lambda: _page(*crud.get_profiles_page(db, cursor=cursor, limit=limit, fieldset=fieldset), fieldset)
+    )
+
+
+def search_profiles_page(db: Session, query: str, cursor: Optional[str] = None, limit: int = 100, fieldset: Optional[Fieldset] = None) -> dict:
+    # Matching is case-insensitive on every backend, so case variants share an entry
+    query = query.lower()
+    return _get_or_load(
+        db, f"search_profiles_page:{limit}:{cursor}:{fieldset!r}:{query}", [PROFILES_TAG],
+        lambda: _page(*crud.search_profiles_page(db, query, cursor=cursor, limit=limit, fieldset=fieldset), fieldset)
+    )
+
+
+def search_facets(db: Session, query: str, facet_limit: int = 10) -> dict:
+    query = query.lower()
+    return _get_or_load(
+        db, f"search_facets:{facet_limit}:{query}", [PROFILES_TAG],
+        lambda: crud.search_facets(db, query, facet_limit=facet_limit)
+    )
+
+
+def get_top_skills(db: Session, limit: int = 10) -> List[dict]:
+    return _get_or_load(
+        db, f"get_top_skills:{limit}", [SKILLS_TAG],
+        lambda: crud.get_top_skills(db, limit=limit)
+    )
@@ -1,20 +1,105 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from app import metrics
 from app.config import settings
 from app.models import Base
+from app.pool_stats import InstrumentedAsyncQueuePool, InstrumentedQueuePool, PoolStats
+from app.replicas import ReplicaSet, RoutingSession, primary_requested, use_primary
 
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def engine_options(url: str, poolclass=InstrumentedQueuePool) -> dict:
+    """Pool keyword arguments for create_engine/create_async_engine built from settings"""
+    parsed = make_url(url)
+    options = {"pool_pre_ping": settings.db_pool_pre_ping}
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options
+    options.update(
+        poolclass=poolclass,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
+    return options
+
+
+def instrument(engine):
+    pool = engine.pool
+    if isinstance(pool, (InstrumentedQueuePool, InstrumentedAsyncQueuePool)):
+        pool.stats = PoolStats(slow_checkout_ms=settings.db_pool_slow_checkout_ms)
+    if settings.metrics_enabled:
+        metrics.instrument_engine(engine)
+    return engine
+
+
+engine = instrument(create_engine(settings.database_url, **engine_options(settings.database_url)))
+
+replica_set = None
+if settings.database_replica_urls:
+    replica_urls = [url.strip() for url in settings.database_replica_urls.split(",") if url.strip()]
+    replica_set = ReplicaSet(
+        [instrument(create_engine(url, **engine_options(url))) for url in replica_urls],
+        policy=settings.db_replica_policy,
+        failure_threshold=settings.db_replica_failure_threshold,
+        retry_seconds=settings.db_replica_retry_seconds,
+    )
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession, replicas=replica_set)
+else:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its async counterpart"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.database_mode == "async":
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    async_url = settings.async_database_url or async_database_url(settings.database_url)
+    async_engine = create_async_engine(async_url, **engine_options(async_url, poolclass=InstrumentedAsyncQueuePool))
+    instrument(async_engine.sync_engine)
+    # Objects must stay readable after commit: lazy refreshes cannot run outside the event loop's greenlet
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 
 def get_db():
     db = SessionLocal()
+    if primary_requested():
+        use_primary(db)
     try:
         yield db
     finally:
         db.close()
 
 
-def create_tables():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database access requires DATABASE_MODE=async")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# The session routes depend on: DATABASE_MODE=async serves requests over the async engine
+get_session = get_async_db if settings.database_mode == "async" else get_db
+
+
+def create_tables() -> bool:
+    """Create the schema for a database Alembic does not manage; returns whether it ran.
+
+    Once alembic_version exists, migrations own the schema (and its backfills), so nothing
+    is created behind their back.
+    """
+    if inspect(engine).has_table("alembic_version"):
+        return False
+    Base.metadata.create_all(bind=engine)
+    return True
\ No newline at end of file
@@ -0,0 +1,121 @@
+import json
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List
+
+from sqlalchemy import select
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder produces the same JSON, only slower
+    orjson = None
+from sqlalchemy.orm import Session
+
+from app.models import Profile, Skill, Project, WorkExperience, profile_skills
+
+# Profile documents are plain dicts shaped like schemas.Profile, built straight from
+# Core rows so bulk readers avoid ORM identity-map and pydantic overhead
+PROFILE_COLUMNS = (
+    Profile.id, Profile.name, Profile.email, Profile.description, Profile.github_url,
+    Profile.linkedin_url, Profile.portfolio_url, Profile.version, Profile.created_at, Profile.updated_at
+)
+SKILL_COLUMNS = (Skill.id, Skill.name, Skill.created_at)
+PROJECT_COLUMNS = (
+    Project.id, Project.title, Project.description, Project.links, Project.profile_id,
+    Project.created_at, Project.updated_at
+)
+WORK_EXPERIENCE_COLUMNS = (
+    WorkExperience.id, WorkExperience.company, WorkExperience.position, WorkExperience.description,
+    WorkExperience.start_date, WorkExperience.end_date, WorkExperience.profile_id,
+    WorkExperience.created_at, WorkExperience.updated_at
+)
+
+
+def _dicts(result) -> Iterator[dict]:
+    keys = list(result.keys())
+    return (dict(zip(keys, row)) for row in result)
+
+
+def load_documents(db: Session, profile_rows: Iterable) -> List[dict]:
+    """Attach skills, projects and work experiences to profile rows with one query per collection"""
+    documents: Dict[int, dict] = {}
+    for row in profile_rows:
+        document = dict(row._mapping)
+        document.update(skills=[], projects=[], work_experiences=[])
+        documents[document["id"]] = document
+    if not documents:
+        return []
+    ids = list(documents)
+    # Core execution on the session's connection skips ORM result processing
+    conn = db.connection()
+
+    skills = conn.execute(
+        select(profile_skills.c.profile_id, *SKILL_COLUMNS)
+        .join(Skill, Skill.id == profile_skills.c.skill_id)
+        .where(profile_skills.c.profile_id.in_(ids))
+        .order_by(profile_skills.c.profile_id, Skill.id)
+    )
+    for skill in _dicts(skills):
+        documents[skill.pop("profile_id")]["skills"].append(skill)
+    for project in _dicts(conn.execute(select(*PROJECT_COLUMNS).where(Project.profile_id.in_(ids)).order_by(Project.id))):
+        documents[project["profile_id"]]["projects"].append(project)
+    for work in _dicts(conn.execute(select(*WORK_EXPERIENCE_COLUMNS).where(WorkExperience.profile_id.in_(ids)).order_by(WorkExperience.id))):
+        documents[work["profile_id"]]["work_experiences"].append(work)
+    return list(documents.values())
+
+
+def iter_documents(db: Session, batch_size: int = 1000) -> Iterator[dict]:
+    """Stream every profile document in id order using a server-side cursor where available"""
+    result = db.connection().execute(
+        select(*PROFILE_COLUMNS).order_by(Profile.id).execution_options(yield_per=batch_size)
+    )
+    for partition in result.partitions():
+        yield from load_documents(db, partition)
+
+
+def _attributes(obj, columns, names=None) -> dict:
+    if names is not None:
+        return {name: getattr(obj, name) for name in names}
+    return {column.key: getattr(obj, column.key) for column in columns}
+
+
+def orm_document(profile: Profile, fieldset=None) -> dict:
+    """Build the same document from a loaded ORM profile without pydantic validation.
+
+    With a fieldsets.Fieldset only its columns and collections are read, matching what
+    crud loaded for it, so no lazy loads are triggered.
+    """
+    if fieldset is None:
+        document = _attributes(profile, PROFILE_COLUMNS)
+        document["skills"] = [_attributes(skill, SKILL_COLUMNS) for skill in profile.skills]
+        document["projects"] = [_attributes(project, PROJECT_COLUMNS) for project in profile.projects]
+        document["work_experiences"] = [_attributes(work, WORK_EXPERIENCE_COLUMNS) for work in profile.work_experiences]
+        return document
+
+    document = _attributes(profile, PROFILE_COLUMNS, fieldset.columns)
+    children = {"skills": SKILL_COLUMNS, "projects": PROJECT_COLUMNS, "work_experiences": WORK_EXPERIENCE_COLUMNS}
+    for name, names in fieldset.relationships.items():
+        document[name] = [_attributes(child, children[name], names) for child in getattr(profile, name)]
+    return document
+
+
+def format_datetime(value: datetime) -> str:
+    """ISO 8601 with UTC written as Z, matching how pydantic serializes response models"""
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return format_datetime(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_bytes(document) -> bytes:
+    # OPT_UTC_Z makes orjson's datetimes identical to format_datetime and to pydantic's
+    if orjson is not None:
+        return orjson.dumps(document, option=orjson.OPT_UTC_Z)
+    return json.dumps(document, default=_default, separators=(",", ":")).encode()
+
+
+def dumps(document) -> str:
+    return dumps_bytes(document).decode()
@@ -0,0 +1,59 @@
+"""Sparse fieldsets for profile reads.
+
+fields= names the profile columns to return (id is always included) and may restrict a
+collection with dotted names such as projects.title; include= names the collections to
+load. Omitting include loads every collection, and an empty include loads none. The parsed
+Fieldset drives the SQL through crud.profile_load_options, so unrequested columns and
+collections are never fetched.
+"""
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app.documents import PROFILE_COLUMNS, PROJECT_COLUMNS, SKILL_COLUMNS, WORK_EXPERIENCE_COLUMNS
+
+PROFILE_FIELDS = {column.key: column for column in PROFILE_COLUMNS}
+RELATIONSHIP_FIELDS = {
+    "skills": {column.key: column for column in SKILL_COLUMNS},
+    "projects": {column.key: column for column in PROJECT_COLUMNS},
+    "work_experiences": {column.key: column for column in WORK_EXPERIENCE_COLUMNS},
+}
+
+
+class Fieldset(NamedTuple):
+    # None means every column; relationships maps each included collection to its columns
+    columns: Optional[Tuple[str, ...]]
+    relationships: Dict[str, Optional[Tuple[str, ...]]]
+
+
+def _names(value: str) -> List[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def parse_fieldset(fields: Optional[str] = None, include: Optional[str] = None) -> Optional[Fieldset]:
+    """Parse fields= / include= query values, raising ValueError on unknown names"""
+    if fields is None and include is None:
+        return None
+    included = list(RELATIONSHIP_FIELDS) if include is None else _names(include)
+    for name in included:
+        if name not in RELATIONSHIP_FIELDS:
+            raise ValueError(f"Unknown relationship: {name}")
+    relationships: Dict[str, Optional[Tuple[str, ...]]] = {name: None for name in included}
+    if fields is None:
+        return Fieldset(None, relationships)
+
+    columns = ["id"]
+    for name in _names(fields):
+        relationship, _, column = name.partition(".")
+        if not column:
+            if name not in PROFILE_FIELDS:
+                raise ValueError(f"Unknown field: {name}")
+            columns.append(name)
+            continue
+        if relationship not in RELATIONSHIP_FIELDS or column not in RELATIONSHIP_FIELDS[relationship]:
+            raise ValueError(f"Unknown field: {name}")
+        if relationship not in relationships:
+            raise ValueError(f"Field {name} requires {relationship} in include")
+        relationships[relationship] = (relationships[relationship] or ("id",)) + (column,)
+    return Fieldset(
+        tuple(dict.fromkeys(columns)),
+        {name: tuple(dict.fromkeys(child)) if child else None for name, child in relationships.items()}
+    )
@@ -7,8 +7,12 @@ from contextlib import asynccontextmanager
 import logging
 from typing import Dict, Any
 
-from app.database import create_tables
-from app.routers import profile, query, health, auth
+from app.config import settings
+from app.database import create_tables, engine
+from app.metrics import MetricsMiddleware
+from app.replicas import ReadYourWritesMiddleware
+from app.pool_stats import pool_snapshot
+from app.routers import profile, query, health, auth, directory, bulk, diagnostics, metrics
 
 # Configure logging with better formatting
 logging.basicConfig(
@@ -23,13 +27,16 @@ async def lifespan(app: FastAPI):
     """Application lifespan management with proper error handling"""
     try:
         logger.info("Starting up Pranjal API")
-        create_tables()
-        logger.info("Database tables created successfully")
+        if create_tables():
+            logger.info("Database tables created successfully")
+        else:
+            logger.info("Schema is managed by Alembic; run 'alembic upgrade head' to apply migrations")
         yield
     except Exception as e:
         logger.error(f"Error during startup: {e}")
         raise
     finally:
+        logger.info(f"Database pool at shutdown: {pool_snapshot(engine.pool)}")
         logger.info("Shutting down Pranjal API")
 
 # Get environment variables with defaults
@@ -63,6 +70,14 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# Only needed when reads can be routed to replicas
+if settings.database_replica_urls:
+    app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=settings.db_replica_sticky_seconds)
+
+# Outermost, so latency covers every other middleware; not installed at all when disabled
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -90,6 +105,19 @@ app.include_router(
     tags=["authentication"]
 )
 
+# Registered ahead of the profile router so /profiles/page is not captured by /profiles/{profile_id}
+app.include_router(
+    directory.router,
+    prefix="/api/v1",
+    tags=["profiles"]
+)
+
+app.include_router(
+    bulk.router,
+    prefix="/api/v1",
+    tags=["profiles"]
+)
+
 app.include_router(
     profile.router,
     prefix="/api/v1",
@@ -108,6 +136,17 @@ app.include_router(
     tags=["health"]
 )
 
+app.include_router(
+    diagnostics.router,
+    prefix="/api/v1",
+    tags=["health"]
+)
+
+app.include_router(
+    metrics.router,
+    tags=["health"]
+)
+
 # Add API versioning endpoint
 @app.get("/api/version", tags=["version"])
 async def get_api_version() -> Dict[str, str]:
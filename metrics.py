@@ -0,0 +1,187 @@
+"""Per-request latency and SQL instrumentation, exported in Prometheus text format.
+
+MetricsMiddleware opens a RequestStats for each HTTP request in a context variable. Engine
+cursor hooks (see instrument_engine) add each statement's count, rows and duration to it, and
+the threadpool that runs sync endpoints copies the context, so those are covered too. Once
+the response starts, the middleware adds a Server-Timing header and records the request
+under its route template. When METRICS_ENABLED is false, neither the middleware nor the hooks
+are installed, so nothing is paid per request or per statement.
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+# Upper bounds of the request latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the statements-per-request histogram buckets
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class RequestStats:
+    __slots__ = ("statements", "rows", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+        self.db_seconds = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        # The execution context lives exactly as long as the statement, even when it fails
+        context.metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "metrics_started", None)
+    if stats is None or started is None:
+        return
+    stats.db_seconds += time.perf_counter() - started
+    stats.statements += 1
+    # Drivers that buffer results client-side (psycopg, asyncpg) report SELECT row counts
+    # here; SQLite only reports rows affected by writes
+    if cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+def instrument_engine(engine):
+    """Attach the statement hooks to a sync Engine (use async_engine.sync_engine for async)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
+
+class _Series:
+    __slots__ = ("latency_buckets", "latency_sum", "statement_buckets", "statements", "rows", "db_seconds")
+
+    def __init__(self):
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.statement_buckets = [0] * (len(STATEMENT_BUCKETS) + 1)
+        self.statements = 0
+        self.rows = 0
+        self.db_seconds = 0.0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._responses: Dict[Tuple[str, str, int], int] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            series = self._series.get((method, route))
+            if series is None:
+                series = self._series[(method, route)] = _Series()
+            series.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            series.latency_sum += seconds
+            series.statement_buckets[bisect.bisect_left(STATEMENT_BUCKETS, stats.statements)] += 1
+            series.statements += stats.statements
+            series.rows += stats.rows
+            series.db_seconds += stats.db_seconds
+            key = (method, route, status)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def render(self) -> str:
+        """Prometheus text exposition format, version 0.0.4"""
+        with self._lock:
+            series = sorted(self._series.items())
+            responses = sorted(self._responses.items())
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, bounds, values: List[Tuple[str, List[int], float]]):
+            for labels, buckets, total in values:
+                cumulative = 0
+                for bound, count in zip(list(bounds) + ["+Inf"], buckets):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {total}")
+                lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+        labelled = [(f'method="{method}",route="{_escape(route)}"', s) for (method, route), s in series]
+        header("http_requests_total", "counter", "HTTP responses by route template and status")
+        for (method, route, status), count in responses:
+            lines.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}')
+        header("http_request_duration_seconds", "histogram", "Time until the response started, by route template")
+        histogram("http_request_duration_seconds", LATENCY_BUCKETS, [(labels, s.latency_buckets, s.latency_sum) for labels, s in labelled])
+        header("db_statements_per_request", "histogram", "SQL statements executed per request")
+        histogram("db_statements_per_request", STATEMENT_BUCKETS, [(labels, s.statement_buckets, s.statements) for labels, s in labelled])
+        header("db_rows_total", "counter", "Rows returned or affected by SQL statements, where the driver reports them")
+        lines.extend(f"db_rows_total{{{labels}}} {s.rows}" for labels, s in labelled)
+        header("db_duration_seconds_total", "counter", "Time spent executing SQL statements")
+        lines.extend(f"db_duration_seconds_total{{{labels}}} {s.db_seconds}" for labels, s in labelled)
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+registry = MetricsRegistry()
+
+
+def _route_template(scope) -> str:
+    """The matched route's path template, so label cardinality stays bounded"""
+    route = scope.get("route")
+    if route is None or not hasattr(route, "path_format"):
+        return "unmatched"
+    # Routes of included routers may only know the path below their prefix; recover the
+    # prefix by rebuilding the concrete suffix from the path parameters
+    try:
+        concrete = route.path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return route.path
+    path = scope["path"]
+    prefix = path[:-len(concrete)] if concrete and path.endswith(concrete) else ""
+    return prefix + route.path
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed responses pass through untouched"""
+
+    def __init__(self, app, registry: MetricsRegistry = registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        observed = {}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - start
+                observed.update(status=message["status"], seconds=elapsed)
+                timing = (
+                    f"db;dur={stats.db_seconds * 1000:.1f};desc=\"{stats.statements} statements\", "
+                    f"app;dur={elapsed * 1000:.1f}"
+                )
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"server-timing", timing.encode())])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self.registry.observe(
+                scope["method"], _route_template(scope), observed.get("status", 500),
+                observed.get("seconds", time.perf_counter() - start), stats
+            )
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table, Boolean, Index, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from datetime import datetime
 
@@ -11,7 +12,9 @@ profile_skills = Table(
     'profile_skills',
     Base.metadata,
     Column('profile_id', Integer, ForeignKey('profiles.id'), primary_key=True),
-    Column('skill_id', Integer, ForeignKey('skills.id'), primary_key=True)
+    Column('skill_id', Integer, ForeignKey('skills.id'), primary_key=True),
+    # The primary key only serves profile -> skills; this serves skill -> profiles joins
+    Index('ix_profile_skills_skill_id_profile_id', 'skill_id', 'profile_id')
 )
 
 
@@ -27,23 +30,41 @@ class Profile(Base):
     portfolio_url = Column(String(255), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Bumped by every write to the profile or its skills, projects and work experiences;
+    # drives ETags and If-Match optimistic concurrency
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Full-text document maintained by app.search; a plain unused column outside PostgreSQL
+    search_vector = deferred(Column(Text().with_variant(TSVECTOR(), "postgresql"), nullable=True))
     
     # Relationships
     skills = relationship("Skill", secondary=profile_skills, back_populates="profiles")
     projects = relationship("Project", back_populates="profile", cascade="all, delete-orphan")
     work_experiences = relationship("WorkExperience", back_populates="profile", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_profiles_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
 
 class Skill(Base):
     __tablename__ = "skills"
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), unique=True, nullable=False, index=True)
+    # Number of profiles linked to this skill, maintained by crud alongside profile_skills
+    profile_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     profiles = relationship("Profile", secondary=profile_skills, back_populates="skills")
 
+    __table_args__ = (
+        # Serves substring (ILIKE '%term%') lookups; requires the pg_trgm extension created below
+        Index("ix_skills_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        # Matches get_top_skills' ORDER BY profile_count DESC, name, so the top skills are an index scan
+        Index("ix_skills_profile_count_name", profile_count.desc(), name),
+    )
+
 
 class Project(Base):
     __tablename__ = "projects"
@@ -59,6 +80,11 @@ class Project(Base):
     # Relationships
     profile = relationship("Profile", back_populates="projects")
 
+    __table_args__ = (
+        # Serves the profile_id foreign key and id-ordered cursors within a profile's projects
+        Index("ix_projects_profile_id_id", "profile_id", "id"),
+    )
+
 
 class WorkExperience(Base):
     __tablename__ = "work_experiences"
@@ -76,4 +102,35 @@ class WorkExperience(Base):
     # Relationships
     profile = relationship("Profile", back_populates="work_experiences")
 
+    __table_args__ = (
+        Index("ix_work_experiences_profile_id_id", "profile_id", "id"),
+    )
+
+
+class ProfileDocument(Base):
+    """Denormalized read model: each profile's fully rendered JSON, refreshed by every crud write"""
+    __tablename__ = "profile_documents"
+    
+    profile_id = Column(Integer, ForeignKey("profiles.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    document = Column(Text, nullable=False)
+
 
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+# SQLite full-text search lives in an FTS5 shadow table keyed by profile id (see app.search)
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL("CREATE VIRTUAL TABLE IF NOT EXISTS profile_search USING fts5(name, description, skills, prefix='2 3')").execute_if(dialect="sqlite")
+)
+event.listen(
+    Base.metadata,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS profile_search").execute_if(dialect="sqlite")
+)
@@ -0,0 +1,96 @@
+import bisect
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger("pranjal_api.pool")
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last bucket is open-ended
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolStats:
+    """Thread-safe counters describing how long connection checkouts take and how often they fail"""
+
+    def __init__(self, slow_checkout_ms: float = 100.0):
+        self.slow_checkout_ms = slow_checkout_ms
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.failures = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def observe_wait(self, wait_ms: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def histogram(self) -> Dict[str, int]:
+        labels = [f"le_{bound}ms" for bound in WAIT_BUCKETS_MS] + ["inf"]
+        return dict(zip(labels, self.wait_buckets))
+
+
+class _InstrumentedPoolMixin:
+    stats: Optional[PoolStats] = None
+
+    def connect(self):
+        if self.stats is None:
+            self.stats = PoolStats()
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except Exception:
+            self.stats.record_failure()
+            logger.warning("Connection checkout failed: %s", pool_snapshot(self))
+            raise
+        wait_ms = (time.perf_counter() - start) * 1000
+        self.stats.observe_wait(wait_ms)
+        if wait_ms >= self.stats.slow_checkout_ms:
+            logger.warning("Slow connection checkout (%.1f ms): %s", wait_ms, pool_snapshot(self))
+        return connection
+
+    def recreate(self):
+        # Keep counters across engine.dispose(), which swaps in a fresh pool
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_snapshot(pool) -> dict:
+    """Current occupancy plus accumulated checkout statistics for a (possibly uninstrumented) pool"""
+    snapshot = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        snapshot.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow_in_use=max(pool.overflow(), 0),
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        snapshot.update(
+            checkouts=stats.checkouts,
+            checkout_failures=stats.failures,
+            wait_avg_ms=round(stats.wait_total_ms / stats.checkouts, 3) if stats.checkouts else 0.0,
+            wait_max_ms=round(stats.wait_max_ms, 3),
+            wait_histogram=stats.histogram(),
+        )
+    return snapshot
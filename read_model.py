@@ -0,0 +1,105 @@
+"""Denormalized profile read model.
+
+profile_documents holds each profile's JSON exactly as the API renders it, together with
+the version and updated_at it was rendered from. crud refreshes the affected rows inside
+every write transaction, so reads are a primary-key or range fetch of pre-encoded bytes
+with no joins, ORM hydration or pydantic validation.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.documents import PROFILE_COLUMNS, dumps, load_documents
+from app.models import Profile, ProfileDocument
+from app.pagination import decode_cursor, encode_cursor
+
+
+def refresh_documents(db: Session, profile_ids: Iterable[int]):
+    """Re-render the given profiles from the current transaction's state"""
+    ids = list(profile_ids)
+    if not ids:
+        return
+    db.flush()
+    documents = load_documents(db, db.connection().execute(select(*PROFILE_COLUMNS).where(Profile.id.in_(ids))))
+    remove_documents(db, ids)
+    if documents:
+        db.execute(insert(ProfileDocument), [
+            {"profile_id": doc["id"], "version": doc["version"], "updated_at": doc["updated_at"], "document": dumps(doc)}
+            for doc in documents
+        ])
+
+
+def remove_documents(db: Session, profile_ids: Iterable[int]):
+    ids = list(profile_ids)
+    if ids:
+        db.execute(delete(ProfileDocument).where(ProfileDocument.profile_id.in_(ids)))
+
+
+def get_document(db: Session, profile_id: int) -> Optional[ProfileDocument]:
+    return db.get(ProfileDocument, profile_id)
+
+
+def list_documents(db: Session, cursor: Optional[str] = None, limit: int = 100) -> Tuple[bytes, Optional[str]]:
+    """Return a JSON array of documents in id order, assembled from stored bytes, and the next cursor"""
+    query = select(ProfileDocument.profile_id, ProfileDocument.document).order_by(ProfileDocument.profile_id)
+    if cursor:
+        last_id, = decode_cursor(cursor)
+        query = query.where(ProfileDocument.profile_id > int(last_id))
+    rows = db.execute(query.limit(limit + 1)).all()
+    next_cursor = encode_cursor(rows[limit - 1].profile_id) if len(rows) > limit else None
+    body = "[" + ",".join(row.document for row in rows[:limit]) + "]"
+    return body.encode(), next_cursor
+
+
+def _id_batches(db: Session, batch_size: int):
+    last_id = 0
+    while True:
+        ids = list(db.execute(
+            select(Profile.id).where(Profile.id > last_id).order_by(Profile.id).limit(batch_size)
+        ).scalars())
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def rebuild(db: Session, batch_size: int = 1000) -> int:
+    """Re-render every profile, committing per batch, and drop documents of deleted profiles"""
+    count = 0
+    for ids in _id_batches(db, batch_size):
+        refresh_documents(db, ids)
+        db.commit()
+        count += len(ids)
+    db.execute(delete(ProfileDocument).where(~ProfileDocument.profile_id.in_(select(Profile.id))))
+    db.commit()
+    return count
+
+
+def check_consistency(db: Session, batch_size: int = 1000, limit: int = 100) -> dict:
+    """Compare stored documents with freshly rendered ones without modifying anything"""
+    report = {"checked": 0, "missing": [], "stale": [], "orphaned": []}
+    for ids in _id_batches(db, batch_size):
+        stored = dict(db.execute(
+            select(ProfileDocument.profile_id, ProfileDocument.document).where(ProfileDocument.profile_id.in_(ids))
+        ).all())
+        rendered = load_documents(db, db.connection().execute(select(*PROFILE_COLUMNS).where(Profile.id.in_(ids))))
+        for doc in rendered:
+            report["checked"] += 1
+            current = stored.get(doc["id"])
+            if current is None:
+                _note(report["missing"], doc["id"], limit)
+            elif current != dumps(doc):
+                _note(report["stale"], doc["id"], limit)
+    orphaned = db.execute(
+        select(ProfileDocument.profile_id).where(~ProfileDocument.profile_id.in_(select(Profile.id))).limit(limit)
+    ).scalars()
+    report["orphaned"] = list(orphaned)
+    report["consistent"] = not (report["missing"] or report["stale"] or report["orphaned"])
+    return report
+
+
+def _note(ids: List[int], profile_id: int, limit: int):
+    # Only the first few offenders are listed; the checker is meant to be run on large tables
+    if len(ids) < limit:
+        ids.append(profile_id)
@@ -0,0 +1,212 @@
+"""Read-replica routing for sync sessions.
+
+When DATABASE_REPLICA_URLS is set, SessionLocal builds RoutingSessions. A session sends its
+reads to one replica, picked when it first reads by round_robin or least_connections (fewest
+checked-out connections). Flushes, Core INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE and raw
+text() statements go to the primary, and from then on the whole session stays there, so a
+request always reads its own writes. use_primary() pins a session up front.
+
+Across requests, ReadYourWritesMiddleware pins every write request to the primary and answers
+successful ones with a short-lived cookie; the same client's reads stay on the primary until
+it expires, which covers replication lag.
+
+Replicas are ejected after db_replica_failure_threshold consecutive connection failures and
+offered again once db_replica_retry_seconds have passed; a successful checkout clears the
+count. With every replica ejected, reads fall back to the primary. The request that hits a
+failing replica still gets its error.
+"""
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from http.cookies import SimpleCookie
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.selectable import SelectBase
+
+POLICIES = ("round_robin", "least_connections")
+_PRIMARY_KEY = "routing_primary"
+_REPLICA_KEY = "routing_replica"
+STICKY_COOKIE = "db_primary_until"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class Replica:
+    __slots__ = ("engine", "failures", "ejected_until", "ejections", "sessions")
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.sessions = 0
+
+    def checked_out(self) -> int:
+        checkedout = getattr(self.engine.pool, "checkedout", None)
+        return checkedout() if checkedout is not None else 0
+
+
+class ReplicaSet:
+    def __init__(self, engines: list, policy: str = "round_robin", failure_threshold: int = 3, retry_seconds: float = 30.0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown replica policy {policy!r}; expected one of {', '.join(POLICIES)}")
+        self.policy = policy
+        self.failure_threshold = failure_threshold
+        self.retry_seconds = retry_seconds
+        self.replicas = [Replica(engine) for engine in engines]
+        self._by_engine = {id(replica.engine): replica for replica in self.replicas}
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+        self.fallbacks = 0
+        for replica in self.replicas:
+            event.listen(replica.engine, "handle_error", self._on_error)
+            event.listen(replica.engine, "checkout", self._checkout_listener(replica.engine))
+
+    def choose(self):
+        """The engine the next reading session should use, or None to read from the primary"""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [replica for replica in self.replicas if replica.ejected_until <= now]
+            if not healthy:
+                self.fallbacks += 1
+                return None
+            # Rotating first also spreads ties evenly under least_connections
+            start = next(self._turn) % len(healthy)
+            healthy = healthy[start:] + healthy[:start]
+            if self.policy == "least_connections":
+                chosen = min(healthy, key=Replica.checked_out)
+            else:
+                chosen = healthy[0]
+            chosen.sessions += 1
+            return chosen.engine
+
+    def record_failure(self, engine):
+        replica = self._by_engine.get(id(engine))
+        if replica is None:
+            return
+        with self._lock:
+            replica.failures += 1
+            if replica.failures >= self.failure_threshold:
+                replica.ejected_until = time.monotonic() + self.retry_seconds
+                replica.ejections += 1
+
+    def record_success(self, engine):
+        replica = self._by_engine.get(id(engine))
+        if replica is not None and replica.failures:
+            with self._lock:
+                replica.failures = 0
+                replica.ejected_until = 0.0
+
+    def _on_error(self, context):
+        # Only connection loss or a failed connect says anything about the replica's health;
+        # a bad query does not (ExceptionContext.connection is None when connecting failed)
+        if context.is_disconnect or context.connection is None:
+            self.record_failure(context.engine)
+
+    def _checkout_listener(self, engine):
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.record_success(engine)
+        return on_checkout
+
+    def stats(self) -> List[dict]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": replica.engine.url.render_as_string(hide_password=True),
+                    "healthy": replica.ejected_until <= now,
+                    "consecutive_failures": replica.failures,
+                    "ejections": replica.ejections,
+                    "retry_in_seconds": round(max(replica.ejected_until - now, 0.0), 3),
+                    "sessions": replica.sessions,
+                    "checked_out": replica.checked_out(),
+                }
+                for replica in self.replicas
+            ]
+
+
+def _is_read(clause) -> bool:
+    return isinstance(clause, SelectBase) and getattr(clause, "_for_update_arg", None) is None
+
+
+class RoutingSession(Session):
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kw)
+        if self.replicas is None or self.info.get(_PRIMARY_KEY) or primary_requested():
+            return primary
+        # db.connection() passes no clause; write paths have pinned the session by then
+        if self._flushing or (clause is not None and not _is_read(clause)):
+            self.info[_PRIMARY_KEY] = True
+            return primary
+        if _REPLICA_KEY not in self.info:
+            self.info[_REPLICA_KEY] = self.replicas.choose()
+        return self.info[_REPLICA_KEY] or primary
+
+
+def use_primary(db: Session) -> Session:
+    """Route every statement of this session to the primary"""
+    db.info[_PRIMARY_KEY] = True
+    return db
+
+
+_primary_requested: ContextVar[bool] = ContextVar("primary_requested", default=False)
+
+
+def primary_requested() -> bool:
+    """Whether the current request must read from the primary (see ReadYourWritesMiddleware)"""
+    return _primary_requested.get()
+
+
+def reads_own_writes(db: Session) -> bool:
+    """Whether this session routes between replicas and must nonetheless read the primary"""
+    if getattr(db, "replicas", None) is None:
+        return False
+    return bool(db.info.get(_PRIMARY_KEY)) or primary_requested()
+
+
+def _sticky_until(scope) -> float:
+    for name, value in scope.get("headers", []):
+        if name == b"cookie":
+            morsel = SimpleCookie(value.decode("latin-1")).get(STICKY_COOKIE)
+            if morsel is not None:
+                try:
+                    return float(morsel.value)
+                except ValueError:
+                    return 0.0
+    return 0.0
+
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware pinning writes, and reads shortly after a client's writes, to the primary"""
+
+    def __init__(self, app, sticky_seconds: float = 5.0):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writing = scope["method"] not in SAFE_METHODS
+        token = _primary_requested.set(writing or _sticky_until(scope) > time.time())
+
+        async def send_with_cookie(message):
+            if writing and message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = (
+                    f"{STICKY_COOKIE}={time.time() + self.sticky_seconds:.3f}; "
+                    f"Max-Age={max(int(self.sticky_seconds), 1)}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _primary_requested.reset(token)
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app import bulk
+from app.auth import get_current_user
+from app.database import SessionLocal, get_db
+from app.schemas import ImportReport
+
+router = APIRouter()
+
+
+@router.post("/profiles/import", response_model=ImportReport)
+async def import_profiles(
+    request: Request,
+    chunk_size: int = Query(bulk.DEFAULT_CHUNK_SIZE, ge=1, le=bulk.MAX_CHUNK_SIZE),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Import newline-delimited ProfileCreate JSON streamed in the request body"""
+    report = ImportReport()
+    chunk, number, pending = [], 0, b""
+    async for data in request.stream():
+        lines = (pending + data).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            number += 1
+            chunk.append((number, line))
+        if len(chunk) >= chunk_size:
+            await run_in_threadpool(bulk.import_chunk, db, chunk, report)
+            chunk = []
+    if pending:
+        chunk.append((number + 1, pending))
+    if chunk:
+        await run_in_threadpool(bulk.import_chunk, db, chunk, report)
+    return report
+
+
+@router.get("/profiles/export")
+def export_profiles(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """Stream every profile with its skills, projects and work experiences as NDJSON or CSV"""
+    if format not in bulk.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+
+    def stream():
+        # The generator owns its session: it outlives the request handler while the body streams
+        db = SessionLocal()
+        try:
+            yield from bulk.export_profiles(db, format)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type=bulk.EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="profiles.{format}"'}
+    )
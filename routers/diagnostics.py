@@ -0,0 +1,45 @@
+from typing import Any, Dict
+from fastapi import APIRouter
+
+from app import database
+from app.cache import response_cache
+from app.similarity import similarity_index
+from app.pool_stats import pool_snapshot
+
+router = APIRouter()
+
+
+@router.get("/health/pool")
+def pool_health() -> Dict[str, Any]:
+    """Connection pool occupancy, checkout wait histogram and checkout failures"""
+    pools = {"sync": pool_snapshot(database.engine.pool)}
+    if database.async_engine is not None:
+        pools["async"] = pool_snapshot(database.async_engine.sync_engine.pool)
+    return pools
+
+
+@router.get("/health/cache")
+def cache_health() -> Dict[str, Any]:
+    """Response cache size and hit, miss, eviction and invalidation counters"""
+    return response_cache.stats()
+
+
+@router.get("/health/coalescing")
+def coalescing_health() -> Dict[str, Any]:
+    """Identical concurrent reads that shared one in-flight query, in total and per function"""
+    return response_cache.flights.stats()
+
+
+@router.get("/health/similarity")
+def similarity_health() -> Dict[str, Any]:
+    """Size, delta backlog and age of the in-memory profile x skill matrix"""
+    return similarity_index.stats()
+
+
+@router.get("/health/replicas")
+def replica_health() -> Dict[str, Any]:
+    """Read replica routing policy, per-replica health and ejections, and fallbacks to the primary"""
+    replica_set = database.replica_set
+    if replica_set is None:
+        return {"policy": None, "replicas": [], "fallbacks": 0}
+    return {"policy": replica_set.policy, "replicas": replica_set.stats(), "fallbacks": replica_set.fallbacks}
@@ -0,0 +1,268 @@
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import crud, crud_async, crud_cached, read_model, similarity
+from app.auth import get_current_user
+from app.conditional import expected_version, is_not_modified, profile_etag, validator_headers
+from app.database import get_session
+from app.documents import orm_document
+from app.fieldsets import parse_fieldset
+from app.responses import FastJSONResponse
+from app.schemas import FacetedProfilePage, Profile, ProfileBatch, ProfilePage, ProfileSummaryPage, ProfileUpdate, ProjectPage, RelatedSkill, SimilarProfile, SkillCount
+
+router = APIRouter()
+
+FIELDS_HELP = "Comma-separated profile fields to return, e.g. name,email,projects.title; id is always included"
+INCLUDE_HELP = "Comma-separated collections to load (skills, projects, work_experiences); empty loads none"
+MAX_BATCH_IDS = 100
+METRIC_PATTERN = f"^({'|'.join(similarity.METRICS)})$"
+
+
+async def _run(db, fn, *args, **kwargs):
+    # get_session yields an AsyncSession under DATABASE_MODE=async; the same crud, crud_cached
+    # and read_model functions then go out over the async driver instead of the threadpool
+    if isinstance(db, AsyncSession):
+        return await crud_async.run_sync(db, fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+def _require_similarity():
+    if not similarity.AVAILABLE:
+        raise HTTPException(status_code=503, detail="Similarity queries require numpy and scipy")
+
+
+@router.get("/profiles/page", response_model=ProfilePage)
+async def list_profiles_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    fields: Optional[str] = Query(None, description=FIELDS_HELP),
+    include: Optional[str] = Query(None, description=INCLUDE_HELP),
+    db: Session = Depends(get_session)
+):
+    """List profiles using keyset pagination; pass next_cursor back to fetch the following page"""
+    try:
+        fieldset = parse_fieldset(fields, include)
+        page = await _run(db, crud_cached.get_profiles_page, cursor=cursor, limit=limit, fieldset=fieldset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(page)
+
+
+@router.get("/profiles/batch", response_model=ProfileBatch)
+async def get_profiles_batch(
+    ids: str = Query(..., description=f"Comma-separated profile ids, at most {MAX_BATCH_IDS}"),
+    fields: Optional[str] = Query(None, description=FIELDS_HELP),
+    include: Optional[str] = Query(None, description=INCLUDE_HELP),
+    db: Session = Depends(get_session)
+):
+    """Get several profiles by id in one round trip; ids that do not exist are listed in missing"""
+    try:
+        profile_ids = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+        fieldset = parse_fieldset(fields, include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not profile_ids or len(profile_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"Pass between 1 and {MAX_BATCH_IDS} ids")
+    profiles = await _run(db, crud.get_profiles_by_ids, profile_ids, fieldset=fieldset)
+    found = {profile.id for profile in profiles}
+    return FastJSONResponse({
+        "items": [orm_document(profile, fieldset) for profile in profiles],
+        "missing": [profile_id for profile_id in profile_ids if profile_id not in found]
+    })
+
+
+@router.get("/profiles/summaries", response_model=ProfileSummaryPage)
+async def list_profile_summaries(
+    sort: str = Query("id", description=f"One of: {', '.join(crud.SUMMARY_SORTS)}"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    db: Session = Depends(get_session)
+):
+    """List profiles with skill, project and work experience counts, sortable by any count"""
+    try:
+        items, next_cursor = await _run(
+            db, crud.get_profile_summaries_page, cursor=cursor, limit=limit, sort=sort, descending=order == "desc"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse({"items": items, "next_cursor": next_cursor})
+
+
+@router.get("/search/page", response_model=ProfilePage)
+async def search_profiles_page(
+    q: str = Query(..., min_length=1),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    fields: Optional[str] = Query(None, description=FIELDS_HELP),
+    include: Optional[str] = Query(None, description=INCLUDE_HELP),
+    db: Session = Depends(get_session)
+):
+    """Search profiles using keyset pagination"""
+    try:
+        fieldset = parse_fieldset(fields, include)
+        page = await _run(db, crud_cached.search_profiles_page, q, cursor=cursor, limit=limit, fieldset=fieldset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(page)
+
+
+@router.get("/search/faceted", response_model=FacetedProfilePage)
+async def search_profiles_faceted(
+    q: str = Query(..., min_length=1),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    facet_limit: int = Query(10, ge=1, le=50),
+    fields: Optional[str] = Query(None, description=FIELDS_HELP),
+    include: Optional[str] = Query(None, description=INCLUDE_HELP),
+    db: Session = Depends(get_session)
+):
+    """Search profiles and count skills and companies across all matches"""
+    try:
+        fieldset = parse_fieldset(fields, include)
+        # The page is the cached /search/page entry; every facet is counted in one statement
+        page = await _run(db, crud_cached.search_profiles_page, q, cursor=cursor, limit=limit, fieldset=fieldset)
+        facets = await _run(db, crud_cached.search_facets, q, facet_limit=facet_limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse({**page, "facets": facets})
+
+
+@router.get("/projects/page", response_model=ProjectPage)
+async def projects_by_skill_page(
+    skill: str = Query(..., min_length=1),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    db: Session = Depends(get_session)
+):
+    """List projects of profiles having a skill whose name contains the given text"""
+    try:
+        items, next_cursor = await _run(db, crud.get_projects_by_skill_page, skill, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/profiles/documents", response_model=ProfilePage)
+async def list_profile_documents(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    db: Session = Depends(get_session)
+):
+    """List profiles in id order straight from the pre-rendered read model"""
+    try:
+        body, next_cursor = await _run(db, read_model.list_documents, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    next_value = f'"{next_cursor}"' if next_cursor else "null"
+    return Response(b'{"items":' + body + b',"next_cursor":' + next_value.encode() + b"}", media_type="application/json")
+
+
+@router.get("/skills/top", response_model=List[SkillCount])
+async def top_skills(limit: int = Query(10, ge=1, le=100), db: Session = Depends(get_session)):
+    """Skills listed on the most profiles"""
+    return FastJSONResponse(await _run(db, crud_cached.get_top_skills, limit=limit))
+
+
+@router.get("/skills/related", response_model=List[RelatedSkill])
+async def related_skills(
+    skill: str = Query(..., min_length=1, description="Exact skill name"),
+    metric: str = Query("cosine", pattern=METRIC_PATTERN),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_session)
+):
+    """Skills most often listed together with the given one, by cosine or Jaccard similarity"""
+    _require_similarity()
+    items = await _run(db, crud.get_related_skills, skill, limit=limit, metric=metric)
+    if items is None:
+        raise HTTPException(status_code=404, detail="Skill not found")
+    return FastJSONResponse(items)
+
+
+@router.get("/profiles/{profile_id:int}/similar", response_model=List[SimilarProfile])
+async def similar_profiles(
+    profile_id: int,
+    metric: str = Query("cosine", pattern=METRIC_PATTERN),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_session)
+):
+    """Profiles with the most similar skill sets, by cosine or Jaccard similarity"""
+    _require_similarity()
+    if not await _run(db, crud.profile_exists, profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FastJSONResponse(await _run(db, crud.get_similar_profiles, profile_id, limit=limit, metric=metric))
+
+
+# The int convertor keeps static paths such as /profiles/export out of these routes
+@router.get("/profiles/{profile_id:int}", response_model=Profile)
+async def get_profile(
+    profile_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_HELP),
+    include: Optional[str] = Query(None, description=INCLUDE_HELP),
+    db: Session = Depends(get_session)
+):
+    """Get a profile; answers If-None-Match / If-Modified-Since with 304 without loading it"""
+    try:
+        fieldset = parse_fieldset(fields, include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if fieldset is not None:
+        # Partial representations are read live and carry no validators, since the
+        # profile ETag describes the full document
+        profile = await _run(db, crud.get_profile, profile_id, fieldset=fieldset)
+        if profile is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return FastJSONResponse(orm_document(profile, fieldset))
+
+    stored = await _run(db, read_model.get_document, profile_id)
+    if stored is not None:
+        # The read model row carries its own validators, so one primary-key fetch serves both cases
+        headers = validator_headers(profile_etag(profile_id, stored.version), stored.updated_at)
+        if is_not_modified(request, headers["ETag"], stored.updated_at):
+            return Response(status_code=304, headers=headers)
+        return Response(stored.document, media_type="application/json", headers=headers)
+
+    # Not rendered yet (e.g. rows written before the read model existed): fall back to the live path
+    current = await _run(db, crud.get_profile_version, profile_id)
+    if current is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    version, updated_at = current
+    headers = validator_headers(profile_etag(profile_id, version), updated_at)
+    if is_not_modified(request, headers["ETag"], updated_at):
+        return Response(status_code=304, headers=headers)
+
+    document = await _run(db, crud_cached.get_profile, profile_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    # Validators describe the representation actually sent, which may be newer than the probe
+    headers = validator_headers(profile_etag(profile_id, document["version"]), datetime.fromisoformat(document["updated_at"]))
+    return JSONResponse(document, headers=headers)
+
+
+@router.put("/profiles/{profile_id:int}", response_model=Profile)
+async def update_profile(
+    profile_id: int,
+    profile_update: ProfileUpdate,
+    request: Request,
+    db: Session = Depends(get_session),
+    current_user: dict = Depends(get_current_user)
+):
+    """Update a profile; with If-Match the update only applies if the profile is unchanged"""
+    current = await _run(db, crud.get_profile_version, profile_id)
+    if current is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    try:
+        version = expected_version(request, profile_id, current[0])
+        profile = await _run(db, crud.update_profile, profile_id, profile_update, expected_version=version)
+    except (ValueError, crud.VersionConflict) as e:
+        raise HTTPException(status_code=412, detail=str(e))
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    headers = validator_headers(profile_etag(profile.id, profile.version), profile.updated_at)
+    return JSONResponse(Profile.model_validate(profile).model_dump(mode="json"), headers=headers)
@@ -103,6 +103,7 @@ class ProfileUpdate(BaseModel):
 
 class Profile(ProfileBase):
     id: int
+    version: int = 1
     skills: List[Skill] = []
     projects: List[Project] = []
     work_experiences: List[WorkExperience] = []
@@ -119,4 +120,68 @@ class ProfileSummary(BaseModel):
     email: EmailStr
     skills_count: int
     projects_count: int
-    work_experiences_count: int
\ No newline at end of file
+    work_experiences_count: int
+
+class ProfilePage(BaseModel):
+    items: List[Profile]
+    next_cursor: Optional[str] = None
+
+
+class ProfileBatch(BaseModel):
+    items: List[Profile]
+    missing: List[int] = []
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class SearchFacets(BaseModel):
+    skills: List[FacetCount] = []
+    companies: List[FacetCount] = []
+    total: int = 0
+    sampled: bool = False
+
+
+class FacetedProfilePage(ProfilePage):
+    facets: SearchFacets
+
+
+class ProfileSummaryPage(BaseModel):
+    items: List[ProfileSummary]
+    next_cursor: Optional[str] = None
+
+
+class SimilarProfile(BaseModel):
+    id: int
+    name: str
+    score: float
+    shared_skills: int
+
+
+class SkillCount(BaseModel):
+    skill: str
+    count: int
+
+
+class RelatedSkill(BaseModel):
+    skill: str
+    score: float
+    co_occurrences: int
+
+
+class ProjectPage(BaseModel):
+    items: List[Project]
+    next_cursor: Optional[str] = None
+
+
+class ImportRecordError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: List[ImportRecordError] = []
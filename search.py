@@ -0,0 +1,109 @@
+import re
+from typing import Iterable, List, Optional
+
+from sqlalchemy import Float, bindparam, cast, column, func, literal_column, select, table, text
+from sqlalchemy.orm import Session
+
+from app.models import Profile
+
+
+# SQLite keeps searchable text in an FTS5 shadow table whose rowid is the profile id;
+# PostgreSQL keeps a weighted tsvector on profiles.search_vector behind a GIN index
+FTS_TABLE = "profile_search"
+fts = table(FTS_TABLE, column("rowid"), column("name"), column("description"), column("skills"))
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def tokenize(query: str) -> List[str]:
+    return _TOKEN.findall(query.lower())
+
+
+def is_supported(db: Session) -> bool:
+    return _dialect(db) in ("postgresql", "sqlite")
+
+
+def match_query(db: Session, query: str):
+    """Select (profile_id, score) for profiles matching every term, best matches scoring highest.
+
+    Each term is matched as a prefix so partial words still find results. Returns None when
+    the query has no searchable terms or the database has no full-text backend.
+    """
+    terms = tokenize(query)
+    if not terms or not is_supported(db):
+        return None
+
+    if _dialect(db) == "postgresql":
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        # ts_rank_cd returns real; as double precision the score survives the round trip through
+        # a ranked cursor (a Python float) and compares equal to itself on the next page
+        return select(
+            Profile.id.label("profile_id"),
+            cast(func.ts_rank_cd(Profile.search_vector, tsquery), Float(53)).label("score")
+        ).where(Profile.search_vector.op("@@")(tsquery))
+
+    # bm25() is lower-is-better; weights favour name, then skills, then description
+    match = " ".join(f'"{term}"*' for term in terms)
+    return select(
+        fts.c.rowid.label("profile_id"),
+        (-func.bm25(literal_column(FTS_TABLE), 10.0, 1.0, 5.0)).label("score")
+    ).where(literal_column(FTS_TABLE).op("MATCH")(bindparam("fts_match", match)))
+
+
+_PG_REINDEX = """
+UPDATE profiles SET search_vector =
+    setweight(to_tsvector('simple', coalesce(profiles.name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce((
+        SELECT string_agg(skills.name, ' ')
+        FROM profile_skills JOIN skills ON skills.id = profile_skills.skill_id
+        WHERE profile_skills.profile_id = profiles.id
+    ), '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(profiles.description, '')), 'C')
+"""
+
+_SQLITE_REINDEX = f"""
+INSERT INTO {FTS_TABLE} (rowid, name, description, skills)
+SELECT profiles.id, profiles.name, coalesce(profiles.description, ''), coalesce((
+    SELECT group_concat(skills.name, ' ')
+    FROM profile_skills JOIN skills ON skills.id = profile_skills.skill_id
+    WHERE profile_skills.profile_id = profiles.id
+), '')
+FROM profiles
+"""
+
+
+def index_profiles(db: Session, profile_ids: Iterable[int]):
+    """Recompute the search document of the given profiles inside the current transaction"""
+    ids = list(profile_ids)
+    if not ids or not is_supported(db):
+        return
+    db.flush()
+    params = {"ids": ids}
+    if _dialect(db) == "postgresql":
+        db.execute(text(_PG_REINDEX + " WHERE profiles.id IN :ids").bindparams(bindparam("ids", expanding=True)), params)
+    else:
+        remove_profiles(db, ids)
+        db.execute(text(_SQLITE_REINDEX + " WHERE profiles.id IN :ids").bindparams(bindparam("ids", expanding=True)), params)
+
+
+def remove_profiles(db: Session, profile_ids: Iterable[int]):
+    ids = list(profile_ids)
+    if ids and _dialect(db) == "sqlite":
+        db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN :ids").bindparams(bindparam("ids", expanding=True)), {"ids": ids})
+
+
+def rebuild_index(db: Session) -> Optional[int]:
+    """Rebuild every search document from scratch and return the number of profiles indexed"""
+    if not is_supported(db):
+        return None
+    if _dialect(db) == "postgresql":
+        db.execute(text(_PG_REINDEX))
+    else:
+        db.execute(text(f"DELETE FROM {FTS_TABLE}"))
+        db.execute(text(_SQLITE_REINDEX))
+    db.commit()
+    return db.query(Profile).count()
@@ -1,12 +1,34 @@
-from sqlalchemy.orm import Session
+"""Seed the database with demo profiles, or generate N synthetic ones.
+
+    python -m app.seed                                  # the two demo profiles
+    python -m app.seed --profiles 100000 --seed 7 --workers 8
+
+Synthetic profiles are a pure function of (seed, index): skills follow a Zipf-like
+distribution over a fixed vocabulary, and project counts and work histories are drawn
+per profile. Workers each bulk-import a contiguous slice of indices over their own
+connection, so any worker count produces the same data.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
 from datetime import datetime, timedelta
-from app.database import SessionLocal
-from app.models import Profile, Skill, Project, WorkExperience
+from app.models import Base, Profile, Skill, Project, WorkExperience
 from app.schemas import ProfileCreate, ProjectCreate, WorkExperienceCreate
-from app import crud
+from app import bulk, crud
 
 
 def seed_database():
+    from app.database import SessionLocal
+
     db = SessionLocal()
     
     try:
@@ -129,5 +151,136 @@ def seed_database():
         db.close()
 
 
+COMMON_SKILLS = [
+    "Python", "JavaScript", "TypeScript", "SQL", "Git", "Docker", "React", "Java", "AWS", "Linux",
+    "PostgreSQL", "Node.js", "REST APIs", "Kubernetes", "Go", "FastAPI", "Django", "C++", "Redis", "CI/CD",
+    "GraphQL", "Terraform", "Rust", "Kotlin", "Swift", "Vue.js", "Angular", "MongoDB", "Kafka", "Spark",
+    "Machine Learning", "PyTorch", "TensorFlow", "Pandas", "NumPy", "Elasticsearch", "GCP", "Azure", "Flask", "Spring",
+    "C#", ".NET", "Ruby", "Rails", "PHP", "Scala", "Bash", "Ansible", "Prometheus", "Grafana",
+]
+_SKILL_AREAS = ["Cloud", "Data", "Mobile", "Security", "Frontend", "Backend", "Platform", "Embedded", "Network", "Game"]
+_SKILL_TOPICS = [
+    "Architecture", "Testing", "Automation", "Analytics", "Design", "Performance", "Operations",
+    "Modeling", "Tooling", "Compliance", "Migration", "Observability", "Integration", "Optimization",
+    "Visualization", "Pipelines", "Storage", "Governance", "Scaling", "Reliability",
+]
+# Most common first: a few skills appear on most profiles, the long tail on very few
+SKILL_VOCABULARY = COMMON_SKILLS + [f"{area} {topic}" for area in _SKILL_AREAS for topic in _SKILL_TOPICS]
+_SKILL_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) ** 1.1 for rank in range(len(SKILL_VOCABULARY))))
+
+FIRST_NAMES = ["Aarav", "Priya", "Liam", "Olivia", "Noah", "Emma", "Wei", "Mei", "Carlos", "Sofia", "Kwame", "Amara", "Yuki", "Hiro", "Fatima", "Omar", "Lena", "Jonas", "Ana", "Mateo"]
+LAST_NAMES = ["Shah", "Sharma", "Smith", "Garcia", "Chen", "Wang", "Mensah", "Okafor", "Tanaka", "Sato", "Khan", "Haddad", "Muller", "Schmidt", "Silva", "Santos", "Kim", "Park", "Novak", "Rossi"]
+COMPANIES = [f"{prefix} {suffix}" for prefix in ("Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Hooli", "Vandelay", "Cyberdyne", "Soylent") for suffix in ("Labs", "Systems", "Inc.", "Cloud", "Analytics")]
+POSITIONS = ["Software Engineer", "Senior Software Engineer", "Staff Engineer", "Data Engineer", "DevOps Engineer", "Frontend Developer", "Backend Developer", "Engineering Manager", "ML Engineer", "Intern"]
+PROJECT_KINDS = ["Dashboard", "API", "Pipeline", "CLI", "Mobile App", "Library", "Platform", "Bot", "Scheduler", "Search Engine"]
+
+
+def _pick_skills(rng: random.Random, count: int) -> List[str]:
+    skills = {}
+    while len(skills) < count:
+        for name in rng.choices(SKILL_VOCABULARY, cum_weights=_SKILL_WEIGHTS, k=count - len(skills)):
+            skills[name] = None
+    return list(skills)
+
+
+def generate_profile(index: int, seed: int = 0) -> ProfileCreate:
+    """The synthetic profile at index; identical for the same (seed, index) on every run"""
+    rng = random.Random(f"{seed}:{index}")
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    skills = _pick_skills(rng, rng.randint(3, 15))
+
+    work_experiences = []
+    end = None
+    cursor = datetime(2026, 1, 1) - timedelta(days=rng.randint(0, 365))
+    for _ in range(rng.randint(1, 6)):
+        start = cursor - timedelta(days=rng.randint(180, 1800))
+        work_experiences.append(WorkExperienceCreate(
+            company=rng.choice(COMPANIES),
+            position=rng.choice(POSITIONS),
+            description=f"Worked on {rng.choice(skills)} and {rng.choice(SKILL_VOCABULARY)} projects.",
+            start_date=start,
+            end_date=end
+        ))
+        end = start - timedelta(days=rng.randint(0, 90))
+        cursor = end
+
+    projects = [
+        ProjectCreate(
+            title=f"{rng.choice(skills)} {rng.choice(PROJECT_KINDS)}",
+            description=f"A {rng.choice(PROJECT_KINDS).lower()} built with {', '.join(rng.sample(skills, min(3, len(skills))))}.",
+            links=json.dumps({"github": f"https://github.com/{first.lower()}{index}/project-{number}"})
+        )
+        for number in range(min(int(rng.expovariate(1 / 2.5)), 10))
+    ]
+    return ProfileCreate(
+        name=f"{first} {last}",
+        email=f"{first.lower()}.{last.lower()}.{index}@example.com",
+        description=f"{rng.choice(POSITIONS)} with {len(work_experiences)} roles, focused on {skills[0]}.",
+        github_url=f"https://github.com/{first.lower()}{index}",
+        skills=skills,
+        projects=projects,
+        work_experiences=work_experiences
+    )
+
+
+def generate_profiles(count: int, seed: int = 0, start: int = 0) -> Iterator[ProfileCreate]:
+    for index in range(start, start + count):
+        yield generate_profile(index, seed)
+
+
+def _seed_slice(url: str, start: int, count: int, seed: int, chunk_size: int) -> int:
+    engine = create_engine(url)
+    try:
+        db = sessionmaker(bind=engine, autoflush=False)()
+        try:
+            lines = (profile.model_dump_json() for profile in generate_profiles(count, seed, start))
+            report = bulk.import_profiles(db, lines, chunk_size=chunk_size)
+        finally:
+            db.close()
+    finally:
+        engine.dispose()
+    if report.failed:
+        raise RuntimeError(f"{report.failed} generated profiles failed to import: {report.errors[:3]}")
+    return report.imported
+
+
+def seed_profiles(url: str, count: int, seed: int = 0, workers: Optional[int] = None, chunk_size: int = bulk.DEFAULT_CHUNK_SIZE) -> int:
+    """Create the schema if needed and bulk-import count synthetic profiles using worker processes"""
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    workers = workers or os.cpu_count() or 1
+    if make_url(url).get_backend_name() == "sqlite":
+        # SQLite allows a single writer; extra processes would only queue on its lock
+        workers = 1
+    if workers == 1:
+        return _seed_slice(url, 0, count, seed, chunk_size)
+
+    step = -(-count // workers)
+    slices = [(start, min(step, count - start)) for start in range(0, count, step)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_seed_slice, url, start, size, seed, chunk_size) for start, size in slices]
+        return sum(future.result() for future in futures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed demo profiles, or generate synthetic ones with --profiles")
+    parser.add_argument("--profiles", type=int, help="Number of synthetic profiles to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count; always 1 on SQLite)")
+    parser.add_argument("--chunk-size", type=int, default=bulk.DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--database-url", help="Database to seed (default: DATABASE_URL)")
+    args = parser.parse_args()
+
+    if args.profiles is None:
+        seed_database()
+        return
+    from app.config import settings
+
+    start = time.perf_counter()
+    imported = seed_profiles(args.database_url or settings.database_url, args.profiles, args.seed, args.workers, args.chunk_size)
+    print(f"Generated {imported} profiles in {time.perf_counter() - start:.1f}s")
+
+
 if __name__ == "__main__":
-    seed_database()
\ No newline at end of file
+    main()
\ No newline at end of file
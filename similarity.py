@@ -0,0 +1,382 @@
+"""In-memory profile x skill matrix for similar-profile and related-skill queries.
+
+The index holds profile_skills as a binary CSR matrix (one row per profile with skills), its
+transpose as per-skill posting lists, and the skill co-occurrence matrix X^T X, whose
+diagonal is each skill's profile count. Similar profiles are found by summing the posting
+lists of the profile's skills with one bincount, then scoring only the profiles that share a
+skill; related skills read one row of the co-occurrence matrix. Both are ranked with
+argpartition, so a query costs time proportional to the postings touched, not to the number
+of profiles.
+
+crud stages each changed profile's complete skill set in the session; after commit it is
+applied to a small delta (rows that replace or extend the base matrix, plus a co-occurrence
+correction), and a background thread folds the delta into the base once it reaches
+similarity_compact_rows.
+Writes from other worker processes are only picked up by the periodic rebuild
+(similarity_rebuild_seconds). Requires numpy and scipy; AVAILABLE is False without them.
+"""
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import profile_skills
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # optional: similarity endpoints answer 503 without them
+    np = sparse = None
+
+AVAILABLE = np is not None
+
+logger = logging.getLogger("pranjal_api.similarity")
+
+METRICS = ("cosine", "jaccard")
+_PENDING_KEY = "similarity_pending"
+_LOAD_BATCH = 100000
+
+
+def _score(metric: str, shared, size, sizes):
+    if metric == "jaccard":
+        return shared / (size + sizes - shared)
+    # Rows emptied by a delete have no shared skills either; keep them at 0 rather than nan
+    return shared / np.sqrt(size * np.maximum(sizes, 1))
+
+
+def _top(scores, keys, limit: int):
+    """Indices of the limit best positive scores, best first, ties broken by ascending key"""
+    cutoff = 0.0
+    if len(scores) > limit:
+        cutoff = -np.partition(-scores, limit - 1)[limit - 1]
+    # Keep every score tied with the limit-th best so the key decides among them
+    keep = np.flatnonzero(scores >= cutoff) if cutoff > 0 else np.flatnonzero(scores > 0)
+    return keep[np.lexsort((keys[keep], -scores[keep]))][:limit]
+
+
+def _resize(matrix, shape):
+    if matrix.shape == shape:
+        return matrix
+    coo = matrix.tocoo()
+    return sparse.csr_matrix((coo.data, (coo.row, coo.col)), shape=shape)
+
+
+class _State:
+    """One immutable generation of the index; apply() derives a new one instead of mutating"""
+
+    def __init__(self, profile_ids, matrix, cooccurrence, skill_ids: List[int]):
+        self.ids = profile_ids                              # sorted, one per row
+        self.matrix = matrix                                # profiles x skills, binary
+        self.postings = matrix.T.tocsr()                    # skills x profiles
+        self.sizes = np.diff(matrix.indptr).astype(np.float32)
+        self.alive = np.ones(len(profile_ids), dtype=bool)  # False once a delta row replaces it
+        self.dead_rows = np.empty(0, dtype=np.int64)
+        self.cooccurrence = cooccurrence
+        self.skill_ids = skill_ids
+        self.column = {skill_id: col for col, skill_id in enumerate(skill_ids)}
+        self.degree = cooccurrence.diagonal().astype(np.float64)
+        self.delta: Dict[int, "np.ndarray"] = {}
+        self.delta_ids = np.empty(0, dtype=np.int64)
+        self.delta_matrix = sparse.csr_matrix((0, len(skill_ids)), dtype=np.float32)
+        self.cooccurrence_delta = sparse.csr_matrix((len(skill_ids), len(skill_ids)), dtype=np.float32)
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def from_pairs(cls, profile_ids, skill_ids, column_ids: Optional[List[int]] = None, cooccurrence=None):
+        """Build from parallel (profile id, skill id) arrays; column_ids keeps an existing column order"""
+        if column_ids is None:
+            columns, cols = np.unique(skill_ids, return_inverse=True)
+            column_ids = columns.tolist()
+        else:
+            columns = np.asarray(column_ids, dtype=np.int64)
+            order = np.argsort(columns)
+            cols = order[np.searchsorted(columns, skill_ids, sorter=order)]
+        ids, rows = np.unique(profile_ids, return_inverse=True)
+        shape = (len(ids), len(column_ids))
+        matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=shape)
+        if cooccurrence is None:
+            cooccurrence = (matrix.T @ matrix).tocsr()
+        return cls(ids, matrix, cooccurrence, list(column_ids))
+
+    def _row(self, profile_id: int) -> Optional[int]:
+        row = int(np.searchsorted(self.ids, profile_id))
+        return row if row < len(self.ids) and self.ids[row] == profile_id else None
+
+    def columns_of(self, profile_id: int):
+        if profile_id in self.delta:
+            return self.delta[profile_id]
+        row = self._row(profile_id)
+        if row is not None and self.alive[row]:
+            return self.matrix.indices[self.matrix.indptr[row]:self.matrix.indptr[row + 1]]
+        return np.empty(0, dtype=np.int32)
+
+    def apply(self, changes: Dict[int, Set[int]]) -> "_State":
+        state = object.__new__(_State)
+        state.__dict__.update(self.__dict__)
+        state.skill_ids = list(self.skill_ids)
+        state.column = dict(self.column)
+        state.delta = dict(self.delta)
+        state.alive = self.alive.copy()
+        for skill_id in sorted({skill_id for skill_ids in changes.values() for skill_id in skill_ids} - state.column.keys()):
+            state.column[skill_id] = len(state.skill_ids)
+            state.skill_ids.append(skill_id)
+        width = len(state.skill_ids)
+        degree = np.zeros(width)
+        degree[:len(self.degree)] = self.degree
+
+        rows, cols, data = [], [], []
+        for profile_id, skill_ids in changes.items():
+            old = self.columns_of(profile_id)
+            new = np.array(sorted(state.column[skill_id] for skill_id in skill_ids), dtype=np.int32)
+            for columns, sign in ((old, -1.0), (new, 1.0)):
+                # Every ordered pair of the profile's skills, the diagonal included
+                rows.append(np.repeat(columns, len(columns)))
+                cols.append(np.tile(columns, len(columns)))
+                data.append(np.full(len(columns) ** 2, sign, dtype=np.float32))
+                degree[columns] += sign
+            row = self._row(profile_id)
+            if row is not None:
+                state.alive[row] = False
+            state.delta[profile_id] = new
+        correction = sparse.csr_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))), shape=(width, width)
+        )
+        state.cooccurrence_delta = _resize(self.cooccurrence_delta, (width, width)) + correction
+        state.cooccurrence_delta.eliminate_zeros()
+        state.degree = degree
+
+        state.delta_ids = np.array(sorted(state.delta), dtype=np.int64)
+        state.dead_rows = np.flatnonzero(~state.alive)
+        lengths = [len(state.delta[profile_id]) for profile_id in state.delta_ids.tolist()]
+        indices = np.concatenate([state.delta[profile_id] for profile_id in state.delta_ids.tolist()] or [np.empty(0, dtype=np.int32)])
+        indptr = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+        state.delta_matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), indices, indptr), shape=(len(state.delta_ids), width)
+        )
+        return state
+
+    def compact(self) -> "_State":
+        """Fold the delta into a fresh base matrix"""
+        live = self.matrix[self.alive].tocoo()
+        delta = self.delta_matrix.tocoo()
+        profile_ids = np.concatenate((self.ids[self.alive][live.row], self.delta_ids[delta.row]))
+        columns = np.asarray(self.skill_ids, dtype=np.int64)
+        skill_ids = np.concatenate((columns[live.col], columns[delta.col]))
+        width = len(self.skill_ids)
+        cooccurrence = _resize(self.cooccurrence, (width, width)) + self.cooccurrence_delta
+        cooccurrence.eliminate_zeros()
+        state = _State.from_pairs(profile_ids, skill_ids, column_ids=self.skill_ids, cooccurrence=cooccurrence)
+        # Only a rebuild sees other workers' writes, so compaction keeps the build's age
+        state.built_at = self.built_at
+        return state
+
+    def similar_profiles(self, profile_id: int, limit: int, metric: str) -> List[Tuple[int, float, int]]:
+        columns = self.columns_of(profile_id)
+        if not len(columns):
+            return []
+        size = np.float32(len(columns))
+
+        # Shared skill counts for every base row at once: one bincount over the posting lists
+        base_columns = columns[columns < self.postings.shape[0]]
+        starts, ends = self.postings.indptr[base_columns], self.postings.indptr[base_columns + 1]
+        hits = np.concatenate([self.postings.indices[start:end] for start, end in zip(starts, ends)] or [np.empty(0, dtype=np.int32)])
+        shared = np.bincount(hits, minlength=len(self.ids)).astype(np.float32)
+        shared[self.dead_rows] = 0
+        own = self._row(profile_id)
+        if own is not None:
+            shared[own] = 0
+        scores = _score(metric, shared, size, self.sizes)
+        best = _top(scores, self.ids, limit)
+        ids, counts, scores = [self.ids[best]], [shared[best]], [scores[best]]
+
+        if len(self.delta_ids):
+            vector = np.zeros(self.delta_matrix.shape[1], dtype=np.float32)
+            vector[columns] = 1
+            delta_shared = self.delta_matrix @ vector
+            delta_shared[self.delta_ids == profile_id] = 0
+            delta_scores = _score(metric, delta_shared, size, np.diff(self.delta_matrix.indptr).astype(np.float32))
+            best = _top(delta_scores, self.delta_ids, limit)
+            ids.append(self.delta_ids[best])
+            counts.append(delta_shared[best])
+            scores.append(delta_scores[best])
+
+        ids, counts, scores = np.concatenate(ids), np.concatenate(counts), np.concatenate(scores)
+        best = _top(scores, ids, limit)
+        return [(int(ids[i]), round(float(scores[i]), 6), int(counts[i])) for i in best]
+
+    def related_skills(self, skill_id: int, limit: int, metric: str) -> List[Tuple[int, float, int]]:
+        column = self.column.get(skill_id)
+        if column is None or self.degree[column] <= 0:
+            return []
+        width = len(self.skill_ids)
+        counts = np.zeros(width)
+        if column < self.cooccurrence.shape[0]:
+            row = self.cooccurrence[column]
+            counts[row.indices] += row.data
+        row = self.cooccurrence_delta[column]
+        counts[row.indices] += row.data
+        counts[column] = 0
+        others = np.flatnonzero(counts > 0)
+        counts = counts[others]
+        scores = _score(metric, counts, self.degree[column], self.degree[others])
+        keys = np.asarray(self.skill_ids, dtype=np.int64)[others]
+        best = _top(scores, keys, limit)
+        return [(int(keys[i]), round(float(scores[i]), 6), int(counts[i])) for i in best]
+
+
+def _load_pairs(db: Session):
+    result = db.execute(
+        select(profile_skills.c.profile_id, profile_skills.c.skill_id).execution_options(yield_per=_LOAD_BATCH)
+    )
+    chunks = [np.fromiter(itertools.chain.from_iterable(part), dtype=np.int64) for part in result.partitions()]
+    pairs = np.concatenate(chunks).reshape(-1, 2) if chunks else np.empty((0, 2), dtype=np.int64)
+    return pairs[:, 0], pairs[:, 1]
+
+
+class SimilarityIndex:
+    def __init__(self, compact_rows: int = 10000, rebuild_seconds: float = 900.0):
+        self.compact_rows = compact_rows
+        self.rebuild_seconds = rebuild_seconds
+        self._state: Optional[_State] = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._building = False
+        self._backlog: List[Dict[int, Set[int]]] = []
+        self.builds = 0
+        self.compactions = 0
+
+    def ensure_ready(self, db: Session):
+        """Build on first use; when the index is older than rebuild_seconds, rebuild it in the background"""
+        state = self._state
+        if state is None:
+            with self._build_lock:
+                if self._state is None:
+                    self.rebuild(db)
+        elif self.rebuild_seconds and time.monotonic() - state.built_at > self.rebuild_seconds and not self._building:
+            self._in_background(self._rebuild_detached)
+
+    def rebuild(self, db: Session):
+        self._start_generation()
+        try:
+            state = _State.from_pairs(*_load_pairs(db))
+        except Exception:
+            self._install(None)
+            raise
+        self._install(state)
+        self.builds += 1
+
+    def _start_generation(self):
+        with self._lock:
+            self._building = True
+            self._backlog = []
+            return self._state
+
+    def _install(self, state: Optional[_State]):
+        with self._lock:
+            if state is not None:
+                # Commits that landed meanwhile may or may not be in the new state; every
+                # change carries the full skill set, so replaying them is always correct
+                for changes in self._backlog:
+                    state = state.apply(changes)
+                self._state = state
+            self._building = False
+            self._backlog = []
+
+    def _in_background(self, work):
+        # The build lock serializes rebuilds and compactions; skip if one is already running
+        if not self._build_lock.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                work()
+            except Exception:
+                logger.exception("Similarity index maintenance failed")
+            finally:
+                self._build_lock.release()
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _rebuild_detached(self):
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            self.rebuild(db)
+        finally:
+            db.close()
+
+    def compact(self):
+        """Fold the delta into the base matrix; writes committed meanwhile are replayed onto it"""
+        snapshot = self._start_generation()
+        try:
+            state = snapshot.compact() if snapshot is not None else None
+        except Exception:
+            self._install(None)
+            raise
+        self._install(state)
+        self.compactions += 1
+
+    def apply(self, changes: Dict[int, Set[int]]):
+        with self._lock:
+            if self._building:
+                self._backlog.append(changes)
+            if self._state is None:
+                return
+            self._state = self._state.apply(changes)
+            due = len(self._state.delta) >= self.compact_rows and not self._building
+        if due:
+            self._in_background(self.compact)
+
+    def similar_profiles(self, profile_id: int, limit: int = 10, metric: str = "cosine") -> List[Tuple[int, float, int]]:
+        """(profile id, score, shared skill count) of the profiles most similar to profile_id"""
+        return self._state.similar_profiles(profile_id, limit, metric)
+
+    def related_skills(self, skill_id: int, limit: int = 10, metric: str = "cosine") -> List[Tuple[int, float, int]]:
+        """(skill id, score, co-occurrence count) of the skills most often held alongside skill_id"""
+        return self._state.related_skills(skill_id, limit, metric)
+
+    def stats(self) -> dict:
+        state = self._state
+        if state is None:
+            return {"built": False, "builds": self.builds}
+        return {
+            "built": True,
+            "builds": self.builds,
+            "compactions": self.compactions,
+            "profiles": int(state.alive.sum()) + sum(1 for columns in state.delta.values() if len(columns)),
+            "skills": len(state.skill_ids),
+            "delta_rows": len(state.delta),
+            "matrix_nnz": int(state.matrix.nnz),
+            "cooccurrence_nnz": int(state.cooccurrence.nnz),
+            "age_seconds": round(time.monotonic() - state.built_at, 3),
+        }
+
+
+similarity_index = SimilarityIndex(
+    compact_rows=settings.similarity_compact_rows,
+    rebuild_seconds=settings.similarity_rebuild_seconds,
+)
+
+
+def stage(db: Session, changes: Dict[int, Iterable[int]]):
+    """Record profiles' complete new skill id sets, applied to the index once the transaction commits"""
+    if AVAILABLE:
+        db.info.setdefault(_PENDING_KEY, {}).update((profile_id, set(skill_ids)) for profile_id, skill_ids in changes.items())
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        similarity_index.apply(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,73 @@
+"""Coalescing of identical concurrent reads.
+
+While a call for a key is in flight, further calls for the same key wait for it and share
+its result (or its exception) instead of running the query again. Nothing is kept once the
+call finishes; keeping results around is the response cache's job.
+"""
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.coalesced_by_function: Counter = Counter()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn for key unless an identical call is in flight, in which case share its outcome.
+
+        Keys are "function:normalized arguments", as built by crud_cached.
+        """
+        if not self.enabled:
+            return fn()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+                self.coalesced_by_function[key.split(":", 1)[0]] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = len(self._calls)
+        return {
+            "enabled": self.enabled,
+            "in_flight": in_flight,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_by_function": dict(self.coalesced_by_function),
+        }
@@ -0,0 +1,71 @@
+import threading
+from typing import Dict, List, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import Skill
+
+
+def trigrams(value: str) -> Set[str]:
+    value = value.lower()
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+class SkillLookup:
+    """Resolve a substring of a skill name to matching skill ids.
+
+    PostgreSQL answers the ILIKE from the pg_trgm GIN index on skills.name. Elsewhere an
+    in-process trigram index over the (small) skills table is used instead; it is rebuilt
+    whenever the table has grown since it was last loaded, which is the only way crud
+    changes skills.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._names: Dict[int, str] = {}
+        self._grams: Dict[str, Set[int]] = {}
+
+    def match_ids(self, db: Session, term: str) -> List[int]:
+        if not term:
+            return []
+        if db.get_bind().dialect.name == "postgresql":
+            return list(db.execute(select(Skill.id).where(Skill.name.icontains(term, autoescape=True))).scalars())
+        self._refresh_if_stale(db)
+        return self._match_local(term.lower())
+
+    def _match_local(self, term: str) -> List[int]:
+        names, grams = self._names, self._grams
+        candidates = None
+        for gram in trigrams(term):
+            ids = grams.get(gram, set())
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        if candidates is None:
+            # Terms shorter than a trigram are checked against every name
+            candidates = names.keys()
+        return sorted(skill_id for skill_id in candidates if term in names[skill_id])
+
+    def _refresh_if_stale(self, db: Session):
+        version = tuple(db.execute(select(func.max(Skill.id), func.count(Skill.id))).one())
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            names = {skill_id: name.lower() for skill_id, name in db.execute(select(Skill.id, Skill.name))}
+            grams: Dict[str, Set[int]] = {}
+            for skill_id, name in names.items():
+                for gram in trigrams(name):
+                    grams.setdefault(gram, set()).add(skill_id)
+            self._names, self._grams, self._version = names, grams, version
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._names, self._grams = {}, {}
+
+
+skill_lookup = SkillLookup()
@@ -0,0 +1,1156 @@
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import crud, read_model
+from app.cache import response_cache
+from app.models import Base, Profile, Skill
+from app.pagination import encode_cursor
+from app.schemas import ProfileCreate, ProfileUpdate, ProjectCreate, ProjectUpdate, WorkExperienceCreate, WorkExperienceUpdate
+from app.skill_lookup import SkillLookup, skill_lookup
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    # Process-wide caches outlive each test's database, so every fresh database starts them over
+    skill_lookup.clear()
+    response_cache.clear()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.database import get_db
+    from app.routers import bulk, directory
+
+    app = FastAPI()
+    app.include_router(directory.router, prefix="/api/v1")
+    app.include_router(bulk.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+class StatementRecorder:
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+    def rows_fetched(self) -> int:
+        # Replay the captured SELECTs on the raw connection to count the rows each returned
+        raw = self.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            return sum(
+                len(cursor.execute(statement, parameters).fetchall())
+                for statement, parameters in self.statements
+                if statement.lstrip().upper().startswith(("SELECT", "WITH"))
+            )
+        finally:
+            raw.close()
+
+
+def make_profile(index: int, children: int) -> ProfileCreate:
+    return ProfileCreate(
+        name=f"Candidate {index}",
+        email=f"candidate{index}@example.com",
+        skills=[f"Skill {index}-{n}" for n in range(children)],
+        projects=[ProjectCreate(title=f"Project {n}", description="Demo") for n in range(children)],
+        work_experiences=[
+            WorkExperienceCreate(company=f"Company {n}", position="Engineer", start_date=datetime(2020, 1, 1))
+            for n in range(children)
+        ]
+    )
+
+
+@pytest.mark.parametrize("fetch", [
+    lambda db: crud.get_profile(db, 1),
+    lambda db: crud.get_profiles(db, limit=5),
+    lambda db: crud.search_profiles(db, "Candidate", limit=5),
+])
+def test_profile_loading_stays_flat_as_children_grow(engine, db, fetch):
+    measurements = {}
+    for children in (1, 10):
+        db.rollback()
+        db.expunge_all()
+        for table in reversed(Base.metadata.sorted_tables):
+            db.execute(table.delete())
+        db.commit()
+        for index in range(5):
+            crud.create_profile(db, make_profile(index, children))
+        db.expunge_all()
+
+        with StatementRecorder(engine) as recorder:
+            profiles = fetch(db)
+        measurements[children] = (len(recorder.statements), recorder.rows_fetched())
+        if not isinstance(profiles, list):
+            profiles = [profiles]
+        assert all(len(p.projects) == children for p in profiles)
+
+        # One row per profile plus one per child: no skills x projects x experiences product
+        assert measurements[children][1] <= len(profiles) * (1 + 3 * children)
+
+    assert measurements[1][0] == measurements[10][0]
+
+
+def test_skill_counters_follow_profile_writes(db):
+    first = crud.create_profile(db, make_profile(1, 0).model_copy(update={"skills": ["Python", "SQL"]}))
+    crud.create_profile(db, make_profile(2, 0).model_copy(update={"skills": ["Python"]}))
+    assert crud.get_top_skills(db) == [{"skill": "Python", "count": 2}, {"skill": "SQL", "count": 1}]
+
+    crud.update_profile(db, first.id, ProfileUpdate(skills=["Go", "Python"]))
+    crud.delete_profile(db, 2)
+    assert crud.get_top_skills(db) == [{"skill": "Go", "count": 1}, {"skill": "Python", "count": 1}]
+    assert crud.reconcile_skill_counts(db) == []
+
+    db.execute(update(Skill).where(Skill.name == "Go").values(profile_count=7))
+    db.commit()
+    assert crud.reconcile_skill_counts(db) == [{"skill": "Go", "stored": 7, "actual": 1}]
+    assert crud.reconcile_skill_counts(db) == []
+
+
+def test_racing_skill_updates_apply_each_link_once(db):
+    profile_id = crud.create_profile(db, ProfileCreate(name="Race", email="race@example.com", skills=["Python"])).id
+    python_id = db.query(Skill.id).filter_by(name="Python").scalar()
+
+    # Two updates of the same profile that both read its links before either wrote
+    for _ in range(2):
+        crud._set_profile_skills(db, profile_id, ["Python", "Go"], current_ids={python_id})
+    go_id = db.query(Skill.id).filter_by(name="Go").scalar()
+    for _ in range(2):
+        crud._set_profile_skills(db, profile_id, ["Go"], current_ids={python_id, go_id})
+    db.commit()
+
+    assert crud.get_top_skills(db) == [{"skill": "Go", "count": 1}]
+    assert crud.reconcile_skill_counts(db) == []
+
+
+def test_skill_writes_are_set_based(engine, db):
+    with StatementRecorder(engine) as few:
+        crud.create_profile(db, make_profile(1, 1))
+    with StatementRecorder(engine) as many:
+        crud.create_profile(db, make_profile(2, 15))
+    skill_statements = lambda recorder: [sql for sql, _ in recorder.statements if "skills" in sql]
+    assert len(skill_statements(few)) == len(skill_statements(many))
+
+    names = [f"Skill 2-{n}" for n in range(15)]
+    with StatementRecorder(engine) as unchanged:
+        crud.update_profile(db, 2, ProfileUpdate(skills=names))
+    assert not [sql for sql, _ in unchanged.statements if sql.startswith(("INSERT INTO profile_skills", "DELETE FROM profile_skills"))]
+
+
+def test_skill_writes_take_locks_in_a_fixed_order(engine, db):
+    # Concurrent writers (seed workers, overlapping create/update calls) must touch shared
+    # skill rows in the same order or PostgreSQL can deadlock them against each other
+    with StatementRecorder(engine) as recorder:
+        crud.create_profile(db, ProfileCreate(name="Order", email="order@example.com", skills=["Zeta", "Alpha", "Mid"]))
+    inserted, = [parameters for sql, parameters in recorder.statements if sql.startswith("INSERT INTO skills")]
+    assert [value for value in inserted if isinstance(value, str)] == ["Alpha", "Mid", "Zeta"]
+
+    ids = {skill.name: skill.id for skill in db.query(Skill)}
+    with StatementRecorder(engine) as recorder:
+        crud.update_profile(db, 1, ProfileUpdate(skills=["Mid", "Beta"]))
+    counters = [parameters for sql, parameters in recorder.statements if sql.startswith("UPDATE skills")]
+    assert len(counters) == 1
+    assert db.get(Skill, ids["Alpha"]).profile_count == 0 and db.get(Skill, ids["Mid"]).profile_count == 1
+
+
+def test_cached_reads_are_invalidated_by_writes(db):
+    from app import crud_cached
+
+    crud.create_profile(db, make_profile(1, 1))
+    crud.create_profile(db, make_profile(2, 1))
+    assert crud_cached.get_profile(db, 1)["name"] == "Candidate 1"
+    other = crud_cached.get_profile(db, 2)
+
+    crud.update_profile(db, 1, ProfileUpdate(name="Renamed"))
+    assert crud_cached.get_profile(db, 1)["name"] == "Renamed"
+    assert crud_cached.get_profile(db, 2) is other
+
+    crud.create_project(db, 2, ProjectCreate(title="Extra", description="Demo"))
+    assert len(crud_cached.get_profile(db, 2)["projects"]) == 2
+
+
+def test_listing_search_and_top_skills_are_served_from_the_cache(engine, db, client):
+    for index in range(3):
+        crud.create_profile(db, make_profile(index, 2))
+    paths = ["/api/v1/profiles/page?limit=2", "/api/v1/search/page?q=Candidate&limit=2", "/api/v1/skills/top?limit=2"]
+    first = [client.get(path).json() for path in paths]
+    assert [profile["id"] for profile in first[0]["items"]] == [1, 2] and first[0]["next_cursor"]
+    assert first[2] == [{"skill": "Skill 0-0", "count": 1}, {"skill": "Skill 0-1", "count": 1}]
+
+    with StatementRecorder(engine) as recorder:
+        # Case variants of a search share one entry
+        assert [client.get(path.replace("Candidate", "CANDIDATE")).json() for path in paths] == first
+    assert recorder.statements == []
+
+    crud.update_profile(db, 2, ProfileUpdate(name="Renamed", skills=["Skill 0-1"]))
+    assert client.get(paths[0]).json()["items"][1]["name"] == "Renamed"
+    assert client.get(paths[2]).json()[0] == {"skill": "Skill 0-1", "count": 2}
+
+
+def test_profile_version_tracks_aggregate_writes(db):
+    profile = crud.create_profile(db, make_profile(1, 1))
+    assert crud.get_profile_version(db, profile.id)[0] == 1
+
+    crud.create_project(db, profile.id, ProjectCreate(title="Extra", description="Demo"))
+    assert crud.get_profile_version(db, profile.id)[0] == 2
+
+    with pytest.raises(crud.VersionConflict):
+        crud.update_profile(db, profile.id, ProfileUpdate(name="Stale"), expected_version=1)
+    updated = crud.update_profile(db, profile.id, ProfileUpdate(name="Fresh"), expected_version=2)
+    assert (updated.name, updated.version) == ("Fresh", 3)
+
+
+
+@pytest.mark.parametrize("rendered", [True, False], ids=["read-model", "live-fallback"])
+def test_profile_reads_answer_conditional_requests(db, client, rendered):
+    crud.create_profile(db, make_profile(1, 2))
+    if not rendered:
+        read_model.remove_documents(db, [1])
+        db.commit()
+        assert read_model.get_document(db, 1) is None
+
+    response = client.get("/api/v1/profiles/1")
+    assert response.status_code == 200 and response.json()["email"] == "candidate1@example.com"
+    etag, last_modified = response.headers["ETag"], response.headers["Last-Modified"]
+    assert etag == '"profile-1-v1"' and last_modified.endswith(" GMT")
+
+    for conditions in ({"If-None-Match": etag}, {"If-None-Match": f"W/{etag}"}, {"If-Modified-Since": last_modified}):
+        response = client.get("/api/v1/profiles/1", headers=conditions)
+        assert response.status_code == 304 and response.content == b""
+        assert (response.headers["ETag"], response.headers["Last-Modified"]) == (etag, last_modified)
+    # If-None-Match takes precedence over a matching If-Modified-Since
+    response = client.get("/api/v1/profiles/1", headers={"If-None-Match": '"profile-1-v0"', "If-Modified-Since": last_modified})
+    assert response.status_code == 200 and response.headers["ETag"] == etag
+
+
+def test_profile_updates_honour_if_match(db, client):
+    from app.auth import get_current_user
+
+    client.app.dependency_overrides[get_current_user] = lambda: {"username": "admin"}
+    crud.create_profile(db, make_profile(1, 1))
+    etag = client.get("/api/v1/profiles/1").headers["ETag"]
+
+    response = client.put("/api/v1/profiles/1", json={"name": "Fresh"}, headers={"If-Match": etag})
+    assert response.status_code == 200 and response.json()["name"] == "Fresh"
+    fresh_etag = response.headers["ETag"]
+    assert fresh_etag == '"profile-1-v2"' and response.headers["Last-Modified"].endswith(" GMT")
+
+    # The first ETag no longer matches, so the write is refused and nothing changes
+    response = client.put("/api/v1/profiles/1", json={"name": "Stale"}, headers={"If-Match": etag})
+    assert response.status_code == 412
+    response = client.get("/api/v1/profiles/1")
+    assert (response.json()["name"], response.headers["ETag"]) == ("Fresh", fresh_etag)
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_documents_encode_timestamps_like_pydantic(monkeypatch, use_orjson):
+    from datetime import timedelta, timezone
+    from pydantic import BaseModel
+    from app import documents
+
+    class Stamped(BaseModel):
+        at: datetime
+
+    if not use_orjson:
+        monkeypatch.setattr(documents, "orjson", None)
+    elif documents.orjson is None:
+        pytest.skip("orjson is not installed")
+    for value in (
+        datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+        datetime(2024, 5, 1, 12, 30, 0, 250000, tzinfo=timezone(timedelta(hours=2))),
+        datetime(2024, 5, 1, 12, 30),
+    ):
+        assert documents.dumps({"at": value}) == Stamped(at=value).model_dump_json()
+
+
+def test_read_model_follows_every_write(db):
+    import json
+
+    profile = crud.create_profile(db, make_profile(1, 2))
+    crud.create_profile(db, make_profile(2, 1))
+    project = crud.create_project(db, profile.id, ProjectCreate(title="Extra", description="Demo"))
+    crud.update_profile(db, profile.id, ProfileUpdate(name="Renamed", skills=["Rust"]))
+    crud.delete_project(db, project.id)
+    crud.delete_profile(db, 2)
+
+    stored = read_model.get_document(db, profile.id)
+    document = json.loads(stored.document)
+    assert (document["name"], stored.version) == ("Renamed", 4)
+    assert [skill["name"] for skill in document["skills"]] == ["Rust"]
+    assert len(document["projects"]) == 2
+    assert read_model.get_document(db, 2) is None
+    assert read_model.check_consistency(db)["consistent"]
+
+
+def test_keyset_pages_cover_every_row_once(db):
+    ids = [crud.create_profile(db, make_profile(index, 1)).id for index in range(7)]
+    seen, cursor, pages = [], None, 0
+    while True:
+        items, cursor = crud.get_profiles_page(db, cursor=cursor, limit=3)
+        seen.extend(profile.id for profile in items)
+        pages += 1
+        if cursor is None:
+            break
+    assert seen == ids and pages == 3
+
+    # A final page that is exactly full still ends the walk without an empty extra page
+    items, cursor = crud.get_profiles_page(db, cursor=encode_cursor(ids[3]), limit=3)
+    assert [profile.id for profile in items] == ids[4:] and cursor is None
+
+
+def test_skill_lookup_matches_substrings_by_trigram(db):
+    lookup = SkillLookup()
+    for index, skills in enumerate([["Python", "PyTorch"], ["Go", "Rust"]]):
+        crud.create_profile(db, ProfileCreate(name=f"Dev {index}", email=f"dev{index}@example.com", skills=skills))
+    ids = {skill.name: skill.id for skill in db.query(Skill)}
+
+    assert lookup.match_ids(db, "YTH") == [ids["Python"]]
+    assert lookup.match_ids(db, "py") == sorted([ids["Python"], ids["PyTorch"]])
+    # Sharing every trigram is not enough: the whole term must appear in the name
+    assert lookup.match_ids(db, "torchpy") == []
+    assert lookup.match_ids(db, "java") == []
+    assert lookup.match_ids(db, "") == []
+    # Shorter than a trigram, every name is checked
+    assert lookup.match_ids(db, "o") == sorted([ids["Python"], ids["PyTorch"], ids["Go"]])
+    assert lookup.match_ids(db, "ST") == [ids["Rust"]]
+
+    crud.create_profile(db, ProfileCreate(name="Dev 2", email="dev2@example.com", skills=["Django"]))
+    assert lookup.match_ids(db, "jango") == [db.query(Skill).filter_by(name="Django").one().id]
+    assert lookup.match_ids(db, "go") == sorted([ids["Go"], db.query(Skill).filter_by(name="Django").one().id])
+
+
+def test_projects_by_skill_honour_limit_and_cursor(db):
+    for index in range(3):
+        profile = make_profile(index, 2)
+        profile.skills = ["Python"] if index != 1 else ["Go"]
+        crud.create_profile(db, profile)
+    expected = [project.id for project in crud.get_projects_by_skill(db, "pyth")]
+    assert len(expected) == 4
+
+    assert [project.id for project in crud.get_projects_by_skill(db, "Python", limit=3)] == expected[:3]
+    assert [project.id for project in crud.get_projects_by_skill(db, "Python", skip=3, limit=3)] == expected[3:]
+    assert crud.get_projects_by_skill(db, "Haskell") == []
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        items, cursor = crud.get_projects_by_skill_page(db, "python", cursor=cursor, limit=2)
+        seen.extend(project.id for project in items)
+        pages += 1
+        if cursor is None:
+            break
+    assert seen == expected and pages == 2
+    assert crud.get_projects_by_skill_page(db, "Haskell") == ([], None)
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/profiles/page?cursor=W1sxXV0",  # [[1]]
+    "/api/v1/profiles/documents?cursor=W1sxXV0",
+    "/api/v1/profiles/summaries?sort=skills_count&cursor=W251bGwsMV0",  # [null,1]
+    "/api/v1/search/page?q=Candidate&cursor=WyJhIiwxXQ",  # ["a",1]
+    "/api/v1/profiles/page?cursor=not-a-cursor",
+])
+def test_malformed_cursors_are_rejected(client, path):
+    assert client.get(path).status_code == 400
+
+
+def test_profile_summaries_count_in_one_statement(engine, db):
+    for index, children in enumerate([3, 1, 2, 1]):
+        crud.create_profile(db, make_profile(index, children))
+
+    with StatementRecorder(engine) as recorder:
+        first, cursor = crud.get_profile_summaries_page(db, limit=2, sort="projects_count", descending=True)
+    assert len(recorder.statements) == 1
+    second, last_cursor = crud.get_profile_summaries_page(db, cursor=cursor, limit=2, sort="projects_count", descending=True)
+    assert last_cursor is None
+    assert [(row["id"], row["projects_count"]) for row in first + second] == [(1, 3), (3, 2), (2, 1), (4, 1)]
+    assert first[0]["skills_count"] == first[0]["work_experiences_count"] == 3
+
+    with pytest.raises(ValueError):
+        crud.get_profile_summaries_page(db, sort="name")
+
+
+def test_sparse_fieldsets_narrow_the_sql(engine, db):
+    from app.documents import orm_document
+    from app.fieldsets import parse_fieldset
+
+    crud.create_profile(db, make_profile(1, 3))
+    db.expunge_all()
+    fieldset = parse_fieldset("name,projects.title", "projects")
+    with StatementRecorder(engine) as recorder:
+        profile = crud.get_profile(db, 1, fieldset=fieldset)
+        document = orm_document(profile, fieldset)
+    sql = " ".join(statement for statement, _ in recorder.statements)
+    assert len(recorder.statements) == 2
+    assert "description" not in sql and "skills" not in sql and "work_experiences" not in sql
+    assert document == {"id": 1, "name": "Candidate 1", "projects": [
+        {"id": n + 1, "title": f"Project {n}"} for n in range(3)
+    ]}
+
+    with pytest.raises(ValueError):
+        parse_fieldset("projects.title", "skills")
+
+
+def test_multi_get_is_one_query_and_existence_an_exists_probe(engine, db):
+    for index in range(1, 5):
+        crud.create_profile(db, make_profile(index, 2))
+
+    with StatementRecorder(engine) as recorder:
+        profiles = crud.get_profiles_by_ids(db, [3, 99, 1, 3])
+    assert [profile.id for profile in profiles] == [3, 1]
+    # One IN query for the profiles, then one batched query per collection
+    profile_queries = [sql for sql, _ in recorder.statements if "FROM profiles" in sql]
+    assert len(recorder.statements) == 4 and len(profile_queries) == 1 and " IN " in profile_queries[0]
+
+    with StatementRecorder(engine) as recorder:
+        assert crud.profile_exists(db, 4) and not crud.profile_exists(db, 99)
+    assert len(recorder.statements) == 2 and all("EXISTS" in sql for sql, _ in recorder.statements)
+
+    with StatementRecorder(engine) as recorder:
+        crud.create_project(db, 1, ProjectCreate(title="Extra", description="Demo"))
+    assert "EXISTS" in recorder.statements[0][0]
+
+
+def test_identical_concurrent_reads_share_one_execution():
+    import threading
+    import time
+    from app.singleflight import SingleFlight
+
+    flights = SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def slow_query():
+        executions.append(1)
+        release.wait(5)
+        return ["result"]
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flights.do("search_profiles_page:10:None:None:python", slow_query)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flights.coalesced < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(executions) == 1 and results == [["result"]] * 5
+    assert flights.stats()["coalesced_by_function"] == {"search_profiles_page": 4}
+    assert flights.do("search_profiles_page:10:None:None:python", lambda: ["again"]) == ["again"]
+
+
+def test_full_text_search_matches_ranks_and_follows_writes(db):
+    def create(name, description=None, skills=()):
+        email = name.lower().replace(" ", ".") + "@example.com"
+        return crud.create_profile(db, ProfileCreate(name=name, email=email, description=description, skills=list(skills))).id
+
+    def found(query):
+        return [profile.id for profile in crud.search_profiles(db, query)]
+
+    by_name = create("Rust Fan")
+    by_skill = create("Bea", skills=["Rust", "Go"])
+    by_description = create("Cy", description="Learning rust slowly")
+
+    # Name outweighs skills, which outweigh the description
+    assert found("rust") == [by_name, by_skill, by_description]
+    # Every term must match, each as a prefix
+    assert found("rust go") == [by_skill]
+    assert found("lear slow") == [by_description]
+    assert found("rust python") == []
+    assert found("ru") == [by_name, by_skill, by_description]
+
+    crud.update_profile(db, by_description, ProfileUpdate(description="Gardening"))
+    crud.update_profile(db, by_skill, ProfileUpdate(skills=["Haskell"]))
+    assert found("rust") == [by_name]
+    assert found("haskell") == [by_skill] and found("garden") == [by_description]
+
+    crud.delete_profile(db, by_name)
+    assert found("rust") == [] and found("fan") == []
+
+
+def test_ranked_search_pages_walk_ties_once(db):
+    best = crud.create_profile(db, ProfileCreate(name="Tied Tied", email="best@example.com")).id
+    tied = [crud.create_profile(db, ProfileCreate(name="Tied", email=f"tied{n}@example.com")).id for n in range(7)]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        items, cursor = crud.search_profiles_page(db, "tied", cursor=cursor, limit=3)
+        seen.extend(profile.id for profile in items)
+        pages += 1
+        if cursor is None:
+            break
+    # Equal scores fall back to id order, so the cursor neither skips nor repeats a tied row
+    assert seen == [best] + tied and pages == 3
+
+
+def test_concurrent_identical_searches_run_once(tmp_path, monkeypatch):
+    import threading
+    import time
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.database import get_session
+    from app.routers import directory
+    from app.singleflight import SingleFlight
+
+    # A file database, so each simulated request gets its own session and connection
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autoflush=False, bind=engine)
+    with Session() as db:
+        for index in range(3):
+            crud.create_profile(db, make_profile(index, 2))
+
+    def session():
+        with Session() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(directory.router, prefix="/api/v1")
+    app.dependency_overrides[get_session] = session
+    client = TestClient(app)
+
+    flights = SingleFlight()
+    monkeypatch.setattr(response_cache, "flights", flights)
+    release = threading.Event()
+    executions = []
+
+    def slow(fn):
+        def run(*args, **kwargs):
+            executions.append(fn.__name__)
+            release.wait(5)
+            return fn(*args, **kwargs)
+        return run
+
+    monkeypatch.setattr(crud, "search_profiles_page", slow(crud.search_profiles_page))
+    monkeypatch.setattr(crud, "search_facets", slow(crud.search_facets))
+    paths = ["/api/v1/search/faceted?q=candidate&limit=2"] * 3 + ["/api/v1/search/page?q=Candidate&limit=2"] * 2
+    responses = []
+    threads = [threading.Thread(target=lambda path=path: responses.append(client.get(path))) for path in paths]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flights.coalesced < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    # Faceted and plain searches share the page load; the facets are counted once, the later
+    # callers either joining that flight or reading its cached result
+    assert executions.count("search_profiles_page") == 1 and executions.count("search_facets") == 1
+    assert flights.stats()["coalesced_by_function"]["search_profiles_page"] == 4
+    assert [response.status_code for response in responses] == [200] * 5
+    faceted = [response.json() for response in responses if "facets" in response.json()]
+    assert len(faceted) == 3 and faceted[0]["facets"]["total"] == 3
+
+
+def test_search_facets_are_counted_in_one_statement(engine, db):
+    for index in range(1, 6):
+        profile = make_profile(index, 2)
+        profile.skills = ["Python", f"Skill {index % 2}"]
+        profile.work_experiences[1].company = "Acme"
+        crud.create_profile(db, profile)
+    crud.create_profile(db, ProfileCreate(name="Someone Else", email="else@example.com", skills=["Python"]))
+
+    with StatementRecorder(engine) as recorder:
+        facets = crud.search_facets(db, "Candidate", facet_limit=2)
+    assert len(recorder.statements) == 1
+    assert facets["total"] == 5 and not facets["sampled"]
+    assert facets["skills"] == [{"value": "Python", "count": 5}, {"value": "Skill 1", "count": 3}]
+    assert facets["companies"] == [{"value": "Acme", "count": 5}, {"value": "Company 0", "count": 5}]
+
+    sampled = crud.search_facets(db, "Candidate", sample_size=3)
+    assert sampled["total"] == 3 and sampled["sampled"]
+    assert sampled["skills"][0] == {"value": "Python", "count": 3}
+    # Exactly sample_size matches: nothing was cut off
+    assert not crud.search_facets(db, "Candidate", sample_size=5)["sampled"]
+
+
+SEEDED_TABLES = {"profiles", "skills", "profile_skills", "projects", "work_experiences", "profile_documents"}
+
+
+@pytest.fixture(scope="module")
+def seeded_db():
+    from app import bulk
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    bulk.import_profiles(session, (make_profile(index, 3).model_dump_json() for index in range(3000)))
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    yield engine, session
+    session.close()
+    engine.dispose()
+
+
+def full_scans(engine, statements, allowed=()):
+    """Return (table, sql) for every SELECT whose plan walks a whole seeded table"""
+    scans = []
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                continue
+            for row in cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall():
+                words = row[3].split()
+                if words[0] == "SCAN" and words[1] in SEEDED_TABLES and words[1] not in allowed:
+                    scans.append((words[1], statement))
+    finally:
+        raw.close()
+    return scans
+
+
+@pytest.mark.parametrize("fetch, allowed", [
+    (lambda db: crud.get_profile(db, 1500), ()),
+    (lambda db: crud.get_profile_by_email(db, "candidate1500@example.com"), ()),
+    (lambda db: crud.get_profile_version(db, 1500), ()),
+    (lambda db: crud.profile_exists(db, 1500), ()),
+    (lambda db: crud.get_profiles_by_ids(db, [5, 1500, 2999]), ()),
+    # OFFSET paging walks the primary key up to the offset by definition; keyset paging is the fix
+    (lambda db: crud.get_profiles(db, skip=100, limit=10), ("profiles",)),
+    (lambda db: crud.get_profiles_page(db, cursor=encode_cursor(1500), limit=10), ()),
+    (lambda db: crud.get_profile_summaries_page(db, cursor=encode_cursor(1500), limit=10), ()),
+    # Without pg_trgm, skill_lookup reads skill names once to build its in-process trigram index
+    (lambda db: crud.get_projects_by_skill(db, "Skill 1500-1"), ("skills",)),
+    (lambda db: crud.get_projects_by_skill_page(db, "Skill 1500-1", cursor=encode_cursor(1)), ("skills",)),
+    (lambda db: crud.get_top_skills(db), ()),
+    (lambda db: crud.search_profiles(db, "Candidate 1500", limit=10), ()),
+    (lambda db: crud.search_profiles_page(db, "Candidate 1500", limit=10), ()),
+    (lambda db: crud.search_facets(db, "Candidate 1500"), ()),
+    (lambda db: read_model.list_documents(db, cursor=encode_cursor(1500), limit=10), ()),
+])
+def test_reads_never_scan_seeded_tables(seeded_db, fetch, allowed):
+    engine, db = seeded_db
+    db.expunge_all()
+    with StatementRecorder(engine) as recorder:
+        fetch(db)
+    scans = full_scans(engine, recorder.statements, allowed)
+    assert not scans, "Full table scans:\n" + "\n\n".join(f"[{table}] {sql}" for table, sql in scans)
+
+
+
+def test_top_skills_are_read_in_index_order(seeded_db):
+    engine, db = seeded_db
+    with StatementRecorder(engine) as recorder:
+        crud.get_top_skills(db)
+    raw = engine.raw_connection()
+    try:
+        plan = [row[3] for statement, parameters in recorder.statements
+                for row in raw.cursor().execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()]
+    finally:
+        raw.close()
+    assert any("ix_skills_profile_count_name" in step for step in plan)
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+def test_pool_stats_count_checkouts_waits_and_timeouts(tmp_path, monkeypatch, caplog):
+    import threading
+    import time
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy.exc import TimeoutError as PoolTimeout
+    from app import database
+    from app.pool_stats import InstrumentedQueuePool, PoolStats
+    from app.routers import diagnostics
+
+    pooled = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+        pool_size=1, max_overflow=0, pool_timeout=0.5
+    )
+    pooled.pool.stats = PoolStats(slow_checkout_ms=50)
+    monkeypatch.setattr(database, "engine", pooled)
+    monkeypatch.setattr(database, "async_engine", None)
+    app = FastAPI()
+    app.include_router(diagnostics.router, prefix="/api/v1")
+    client = TestClient(app)
+
+    # With the only connection held, a second checkout waits until it is returned
+    held = pooled.connect()
+    waiter = threading.Thread(target=lambda: pooled.connect().close())
+    waiter.start()
+    time.sleep(0.1)
+    snapshot = client.get("/api/v1/health/pool").json()["sync"]
+    assert (snapshot["pool"], snapshot["size"], snapshot["checked_out"]) == ("InstrumentedQueuePool", 1, 1)
+    held.close()
+    waiter.join()
+
+    # ...and once the pool stays exhausted past pool_timeout, the checkout fails
+    with pooled.connect():
+        with pytest.raises(PoolTimeout):
+            pooled.connect()
+    assert "Slow connection checkout" in caplog.text and "Connection checkout failed" in caplog.text
+
+    snapshot = client.get("/api/v1/health/pool").json()["sync"]
+    assert (snapshot["checkouts"], snapshot["checkout_failures"], snapshot["checked_out"]) == (3, 1, 0)
+    assert sum(snapshot["wait_histogram"].values()) == 3
+    # Two immediate checkouts and one that waited for the held connection
+    histogram = snapshot["wait_histogram"]
+    assert sum(histogram[f"le_{bound}ms"] for bound in (1, 5, 10, 25, 50)) == 2
+    assert snapshot["wait_max_ms"] >= 90 and 0 < snapshot["wait_avg_ms"] < snapshot["wait_max_ms"]
+
+    # engine.dispose() swaps in a new pool but keeps the counters
+    pooled.dispose()
+    assert client.get("/api/v1/health/pool").json()["sync"]["checkouts"] == 3
+    pooled.dispose()
+
+def test_metrics_middleware_records_sql_per_route(engine, db):
+    from fastapi import APIRouter, FastAPI
+    from fastapi.testclient import TestClient
+    from app import metrics
+
+    crud.create_profile(db, make_profile(1, 2))
+    metrics.instrument_engine(engine)
+    router = APIRouter()
+
+    @router.get("/profiles/{profile_id}")
+    def read(profile_id: int):
+        return {"name": crud.get_profile(db, profile_id).name}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    registry = metrics.MetricsRegistry()
+    app.add_middleware(metrics.MetricsMiddleware, registry=registry)
+    response = TestClient(app).get("/api/v1/profiles/1")
+
+    assert '4 statements' in response.headers["server-timing"]
+    text = registry.render()
+    labels = 'method="GET",route="/api/v1/profiles/{profile_id}"'
+    assert f'http_requests_total{{{labels},status="200"}} 1' in text
+    assert f'db_statements_per_request_bucket{{{labels},le="5"}} 1' in text
+    assert f'db_statements_per_request_bucket{{{labels},le="2"}} 0' in text
+
+
+@pytest.fixture
+def query_budget(seeded_db):
+    """Fail the test, listing the SQL, if the block runs more statements or fetches more rows than budgeted"""
+    engine, _ = seeded_db
+
+    @contextmanager
+    def budget(statements: int, rows: int):
+        with StatementRecorder(engine) as recorder:
+            yield recorder
+        fetched = recorder.rows_fetched()
+        if len(recorder.statements) > statements or fetched > rows:
+            listing = "\n\n".join(f"{number}. {sql}" for number, (sql, _) in enumerate(recorder.statements, 1))
+            pytest.fail(
+                f"Query budget exceeded: {len(recorder.statements)} statements (budget {statements}), "
+                f"{fetched} rows (budget {rows})\n\n{listing}"
+            )
+
+    return budget
+
+
+# (call, statements, rows) against 3000 seeded profiles with 3 skills, projects and experiences each
+@pytest.mark.parametrize("fetch, statements, rows", [
+    (lambda db: crud.get_profile(db, 1500), 4, 10),
+    (lambda db: crud.get_profiles(db, skip=100, limit=20), 4, 200),
+    (lambda db: crud.get_profiles_page(db, cursor=encode_cursor(1500), limit=20), 4, 210),
+    (lambda db: crud.get_profiles_by_ids(db, [5, 1500, 2999]), 4, 30),
+    (lambda db: crud.get_profile_summaries_page(db, limit=20, sort="projects_count", descending=True), 1, 21),
+    (lambda db: crud.get_projects_by_skill(db, "Skill 1500-1"), 2, 10),
+    (lambda db: crud.get_top_skills(db), 1, 10),
+    (lambda db: crud.search_profiles(db, "Candidate 1500", limit=20), 4, 200),
+    (lambda db: crud.search_profiles_page(db, "Candidate 1500", limit=20), 4, 210),
+    (lambda db: crud.search_facets(db, "Candidate", facet_limit=10), 1, 21),
+    (lambda db: crud.profile_exists(db, 1500), 1, 1),
+])
+def test_crud_reads_stay_within_query_budget(seeded_db, query_budget, fetch, statements, rows):
+    _, db = seeded_db
+    # Warm process-wide state (the SQLite skill trigram index) so budgets measure steady state
+    crud.get_projects_by_skill(db, "Skill 1500-1")
+    db.expunge_all()
+    with query_budget(statements, rows):
+        fetch(db)
+
+
+@pytest.mark.parametrize("path, statements, rows", [
+    ("/api/v1/profiles/1500", 1, 1),
+    ("/api/v1/profiles/1500?fields=name&include=", 1, 1),
+    ("/api/v1/profiles/page?limit=20", 4, 210),
+    ("/api/v1/profiles/documents?limit=20", 1, 21),
+    ("/api/v1/profiles/summaries?sort=skills_count&limit=20", 1, 21),
+    ("/api/v1/profiles/batch?ids=5,1500,2999", 4, 30),
+    ("/api/v1/search/page?q=Candidate&limit=20", 4, 210),
+    ("/api/v1/search/faceted?q=Candidate&limit=20", 5, 231),
+    ("/api/v1/projects/page?skill=Skill%201500-1", 2, 10),
+])
+def test_endpoints_stay_within_query_budget(seeded_db, query_budget, path, statements, rows):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.database import get_db
+    from app.routers import directory
+
+    _, db = seeded_db
+    crud.get_projects_by_skill(db, "Skill 1500-1")
+    db.expunge_all()
+    app = FastAPI()
+    app.include_router(directory.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = lambda: db
+    client = TestClient(app)
+    with query_budget(statements, rows):
+        response = client.get(path)
+    assert response.status_code == 200
+
+
+@pytest.fixture
+def scratch_profile(seeded_db):
+    """A profile with three of each child to write to; everything added to the seed is removed afterwards"""
+    _, db = seeded_db
+    last_id = db.query(Profile.id).order_by(Profile.id.desc()).limit(1).scalar()
+    profile = crud.create_profile(db, make_profile(9000, 3))
+    yield {"profile": profile.id, "project": profile.projects[0].id, "work": profile.work_experiences[0].id}
+    for profile_id, in db.query(Profile.id).filter(Profile.id > last_id).all():
+        crud.delete_profile(db, profile_id)
+
+
+# (write, statements, rows) against the same seed; each write also refreshes the search index and read model
+@pytest.mark.parametrize("write, statements, rows", [
+    (lambda db, ids: crud.create_profile(db, make_profile(9001, 3)), 24, 26),
+    (lambda db, ids: crud.update_profile(db, ids["profile"], ProfileUpdate(name="Renamed")), 18, 30),
+    (lambda db, ids: crud.update_profile(db, ids["profile"], ProfileUpdate(skills=["Skill 9000-0", "Fresh"])), 23, 30),
+    (lambda db, ids: crud.delete_profile(db, ids["profile"]), 11, 0),
+    (lambda db, ids: crud.create_project(db, ids["profile"], ProjectCreate(title="New", description="Demo")), 10, 13),
+    (lambda db, ids: crud.update_project(db, ids["project"], ProjectUpdate(title="Renamed")), 10, 12),
+    (lambda db, ids: crud.delete_project(db, ids["project"]), 9, 9),
+    (lambda db, ids: crud.create_work_experience(db, ids["profile"], WorkExperienceCreate(company="New", position="Engineer", start_date=datetime(2024, 1, 1))), 10, 13),
+    (lambda db, ids: crud.update_work_experience(db, ids["work"], WorkExperienceUpdate(position="Lead")), 10, 12),
+    (lambda db, ids: crud.delete_work_experience(db, ids["work"]), 9, 9),
+])
+def test_crud_writes_stay_within_query_budget(seeded_db, query_budget, scratch_profile, write, statements, rows):
+    _, db = seeded_db
+    db.expunge_all()
+    with query_budget(statements, rows):
+        write(db, scratch_profile)
+
+
+def test_directory_routes_serve_async_sessions(tmp_path, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+    from app.database import get_session
+    from app.routers import directory
+
+    url = f"sqlite:///{tmp_path / 'directory.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    Session = sessionmaker(autoflush=False, bind=sync_engine)
+    with Session() as db:
+        for index in range(3):
+            crud.create_profile(db, make_profile(index, 2))
+    # Each TestClient request may run on its own event loop, so connections are not pooled across them
+    async_engine = create_async_engine(url.replace("sqlite:", "sqlite+aiosqlite:"), poolclass=NullPool)
+    AsyncSessions = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+    async def async_session():
+        async with AsyncSessions() as db:
+            yield db
+
+    def sync_session():
+        with Session() as db:
+            yield db
+
+    # Both clients must query the database themselves rather than share cached pages
+    monkeypatch.setattr(response_cache, "enabled", False)
+    clients = {}
+    for mode, dependency in (("async", async_session), ("sync", sync_session)):
+        app = FastAPI()
+        app.include_router(directory.router, prefix="/api/v1")
+        app.dependency_overrides[get_session] = dependency
+        clients[mode] = TestClient(app)
+
+    paths = [
+        "/api/v1/profiles/1",
+        "/api/v1/profiles/2?fields=name&include=skills",
+        "/api/v1/profiles/page?limit=2",
+        "/api/v1/profiles/batch?ids=3,1,9",
+        "/api/v1/profiles/summaries?sort=projects_count&limit=2",
+        "/api/v1/search/page?q=candidate&limit=2",
+        "/api/v1/search/faceted?q=candidate",
+    ]
+    with StatementRecorder(async_engine.sync_engine) as recorder:
+        served = [clients["async"].get(path) for path in paths]
+    assert [response.status_code for response in served] == [200] * len(paths)
+    assert len(recorder.statements) >= len(paths)
+    assert [response.json() for response in served] == [clients["sync"].get(path).json() for path in paths]
+    assert clients["async"].get("/api/v1/profiles/99").status_code == 404
+    sync_engine.dispose()
+
+
+def test_migrations_upgrade_a_baseline_database(tmp_path, monkeypatch):
+    import os
+    from alembic import command
+    from alembic.autogenerate import compare_metadata
+    from alembic.config import Config
+    from alembic.migration import MigrationContext
+    from app.config import settings
+    from app.search import FTS_TABLE
+
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    monkeypatch.setattr(settings, "database_url", url)
+    config = Config()
+    config.set_main_option("script_location", os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic"))
+    engine = create_engine(url)
+
+    # Rows written by the app before any of the derived columns and tables existed
+    command.upgrade(config, "0001")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO profiles (name, email, description) VALUES "
+            "('Ada Lovelace', 'ada@example.com', 'Analytical engines'), ('Alan Turing', 'alan@example.com', NULL)"
+        )
+        conn.exec_driver_sql("INSERT INTO skills (name) VALUES ('Python'), ('Logic')")
+        conn.exec_driver_sql("INSERT INTO profile_skills (profile_id, skill_id) VALUES (1, 1), (2, 1), (2, 2)")
+        conn.exec_driver_sql("INSERT INTO projects (title, description, profile_id) VALUES ('Engine', 'Demo', 1)")
+    command.upgrade(config, "head")
+
+    db = sessionmaker(autoflush=False, bind=engine)()
+    assert [profile.id for profile in crud.search_profiles(db, "logic")] == [2]
+    assert [profile.id for profile in crud.search_profiles(db, "analyt")] == [1]
+    assert crud.get_top_skills(db) == [{"skill": "Python", "count": 2}, {"skill": "Logic", "count": 1}]
+    assert [profile.version for profile in db.query(Profile).order_by(Profile.id)] == [1, 1]
+    # The migration leaves rendering documents to rebuild-read-model
+    assert read_model.check_consistency(db)["missing"] == [1, 2]
+    read_model.rebuild(db)
+    assert read_model.check_consistency(db)["consistent"] and read_model.get_document(db, 1) is not None
+    db.close()
+
+    def include_object(obj, name, type_, reflected, compare_to):
+        # As in alembic/env.py: FTS5 tables belong to app.search, GIN indexes only exist on PostgreSQL
+        if type_ == "table":
+            return not name.startswith(FTS_TABLE)
+        return reflected or type_ != "index" or obj.kwargs.get("postgresql_using") != "gin"
+
+    # The migrated schema is the one the models describe
+    with engine.connect() as conn:
+        context = MigrationContext.configure(conn, opts={"include_object": include_object})
+        assert compare_metadata(context, Base.metadata) == []
+
+    command.downgrade(config, "base")
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'").scalars().all() == ["alembic_version"]
+    engine.dispose()
+
+
+def test_reads_route_to_replicas_and_writes_stick_to_primary(tmp_path):
+    from sqlalchemy.exc import OperationalError
+    from app.replicas import ReplicaSet, RoutingSession, use_primary
+
+    primary, replica, spare = (create_engine(f"sqlite:///{tmp_path / name}.db") for name in ("primary", "replica", "spare"))
+    for target in (primary, replica, spare):
+        Base.metadata.create_all(bind=target)
+    Session = sessionmaker(autoflush=False, bind=primary, class_=RoutingSession, replicas=ReplicaSet([replica]))
+
+    # The replica never receives the write, so whatever a session sees shows where it read from
+    writer = Session()
+    profile_id = crud.create_profile(writer, make_profile(1, 2)).id
+    assert crud.get_profile(writer, profile_id) is not None
+    writer.close()
+    reader = Session()
+    assert crud.get_profile(reader, profile_id) is None
+    reader.close()
+    pinned = use_primary(Session())
+    assert crud.get_profile(pinned, profile_id).email == "candidate1@example.com"
+    pinned.close()
+
+    least = ReplicaSet([replica, spare], policy="least_connections")
+    with replica.connect():
+        assert {least.choose() for _ in range(4)} == {spare}
+
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replicas = ReplicaSet([broken], failure_threshold=1, retry_seconds=60)
+    Session = sessionmaker(autoflush=False, bind=primary, class_=RoutingSession, replicas=replicas)
+    with pytest.raises(OperationalError):
+        crud.get_profile(Session(), profile_id)
+    assert not replicas.stats()[0]["healthy"]
+    assert crud.get_profile(Session(), profile_id) is not None
+    assert replicas.fallbacks == 1
+    for target in (primary, replica, spare, broken):
+        target.dispose()
+
+
+def test_writers_never_read_cached_replica_lag(engine, tmp_path):
+    from app import crud_cached, replicas
+    from app.replicas import ReplicaSet, RoutingSession, use_primary
+
+    primary, replica = (create_engine(f"sqlite:///{tmp_path / name}.db") for name in ("primary", "replica"))
+    for target in (primary, replica):
+        Base.metadata.create_all(bind=target)
+        seed = sessionmaker(autoflush=False, bind=target)()
+        crud.create_profile(seed, make_profile(1, 1))
+        seed.close()
+    Session = sessionmaker(autoflush=False, bind=primary, class_=RoutingSession, replicas=ReplicaSet([replica]))
+
+    # The replica stands in for one that has not applied the write yet
+    writer = Session()
+    crud.update_profile(writer, 1, ProfileUpdate(name="Renamed"))
+    reader = Session()
+    assert crud_cached.get_profile(reader, 1)["name"] == "Candidate 1"
+    reader.close()
+
+    # The lagging read was cached under the post-write tag versions; the writer must not get it
+    assert crud_cached.get_profile(writer, 1)["name"] == "Renamed"
+    writer.close()
+    token = replicas._primary_requested.set(True)
+    try:
+        follower = Session()
+        assert crud_cached.get_profile(follower, 1)["name"] == "Renamed"
+        follower.close()
+    finally:
+        replicas._primary_requested.reset(token)
+    pinned = use_primary(Session())
+    assert crud_cached.get_profile(pinned, 1)["name"] == "Renamed"
+    pinned.close()
+    for target in (primary, replica):
+        target.dispose()
+
+
+def test_similarity_index_follows_skill_writes(db, monkeypatch):
+    pytest.importorskip("scipy")
+    from app import similarity
+
+    index = similarity.SimilarityIndex(compact_rows=2)
+    monkeypatch.setattr(similarity, "similarity_index", index)
+    skill_sets = [["Python", "SQL", "Docker"], ["Python", "SQL"], ["Python", "Go"], ["Rust"]]
+    ids = [crud.create_profile(db, make_profile(n, 0).model_copy(update={"skills": skills})).id for n, skills in enumerate(skill_sets)]
+
+    similar = crud.get_similar_profiles(db, ids[0], limit=5)
+    assert [(item["id"], item["shared_skills"]) for item in similar] == [(ids[1], 2), (ids[2], 1)]
+    assert similar[0]["score"] == pytest.approx(2 / 6 ** 0.5, abs=1e-6)
+    assert crud.get_similar_profiles(db, ids[0], metric="jaccard")[1]["score"] == pytest.approx(1 / 4, abs=1e-6)
+
+    # Later writes are applied from the commit hook, without reloading the matrix
+    crud.update_profile(db, ids[3], ProfileUpdate(skills=["Python", "SQL", "Docker"]))
+    crud.delete_profile(db, ids[1])
+    expected = [(ids[3], 1.0, 3), (ids[2], pytest.approx(1 / 6 ** 0.5, abs=1e-6), 1)]
+    assert [(item["id"], item["score"], item["shared_skills"]) for item in crud.get_similar_profiles(db, ids[0])] == expected
+    related = crud.get_related_skills(db, "Python")
+    assert [(item["skill"], item["co_occurrences"]) for item in related] == [("Docker", 2), ("SQL", 2), ("Go", 1)]
+    assert crud.get_related_skills(db, "COBOL") is None
+    assert index.builds == 1
+
+    index.rebuild(db)
+    assert [(item["id"], item["score"], item["shared_skills"]) for item in crud.get_similar_profiles(db, ids[0])] == expected
+    assert crud.get_related_skills(db, "Python") == related
+
+
+def test_import_reports_bad_records_without_aborting(db, monkeypatch):
+    import json
+    from sqlalchemy.exc import DataError
+    from app import bulk
+
+    crud.create_profile(db, ProfileCreate(name="Existing", email="existing@example.com"))
+    record = lambda index, **fields: json.dumps({"name": f"Imported {index}", "email": f"imported{index}@example.com", **fields})
+    lines = [
+        record(1, skills=["Python"], projects=[{"title": "Site", "description": "Demo"}]),
+        "{not json",
+        record(2, name="x" * 101),
+        record(3, projects=[{"title": "t" * 201, "description": "Demo"}]),
+        record(1),
+        json.dumps({"name": "Again", "email": "existing@example.com"}),
+        record(4, description="rejected by the database"),
+        "",
+        record(5, skills=["Python", "Go"]),
+    ]
+
+    # Stand-in for a value PostgreSQL refuses with a DataError rather than an IntegrityError
+    insert_profiles = bulk._insert_profiles
+
+    def insert_checked(db, profiles):
+        if any(profile.description == "rejected by the database" for profile in profiles):
+            raise DataError("INSERT INTO profiles ...", {}, Exception("value rejected"))
+        insert_profiles(db, profiles)
+
+    monkeypatch.setattr(bulk, "_insert_profiles", insert_checked)
+    report = bulk.import_profiles(db, lines, chunk_size=4)
+
+    assert report.imported == 2 and report.failed == 6
+    errors = {error.line: error.error for error in report.errors}
+    assert sorted(errors) == [2, 3, 4, 5, 6, 7]
+    assert errors[3] == "name: String should have at most 100 characters"
+    assert errors[4] == "projects.0.title: String should have at most 200 characters"
+    # Line 5 repeats line 1, which the previous chunk already committed
+    assert "already exists" in errors[5] and "already exists" in errors[6] and "value rejected" in errors[7]
+    imported = crud.get_profile_by_email(db, "imported5@example.com")
+    assert sorted(skill.name for skill in imported.skills) == ["Go", "Python"]
+    assert db.query(Skill).filter_by(name="Python").one().profile_count == 2
+
+
+@pytest.mark.parametrize("chunk_size, status", [(0, 422), (10001, 422), (2, 200)])
+def test_import_endpoint_bounds_the_chunk_size(client, chunk_size, status):
+    from app.auth import get_current_user
+
+    client.app.dependency_overrides[get_current_user] = lambda: {"username": "admin"}
+    body = "\n".join(make_profile(index, 1).model_dump_json() for index in range(3))
+    response = client.post(f"/api/v1/profiles/import?chunk_size={chunk_size}", content=body)
+    assert response.status_code == status
+    if status == 200:
+        assert response.json()["imported"] == 3
+
+
+def test_export_streams_nested_profiles(engine, db, client, monkeypatch):
+    import csv
+    import io
+    import json
+    from app.documents import dumps, orm_document
+    from app.routers import bulk as bulk_router
+
+    # The export opens its own session, since it outlives the request handler
+    monkeypatch.setattr(bulk_router, "SessionLocal", sessionmaker(bind=engine))
+    ids = [crud.create_profile(db, make_profile(index, 2)).id for index in range(3)]
+    crud.create_profile(db, ProfileCreate(name="Bare", email="bare@example.com"))
+    expected = [json.loads(dumps(orm_document(profile))) for profile in crud.get_profiles_by_ids(db, ids + [4])]
+    expected = {document["id"]: document for document in expected}
+
+    response = client.get("/api/v1/profiles/export?format=ndjson")
+    assert response.status_code == 200
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert [document["id"] for document in exported] == [1, 2, 3, 4]
+    for document in exported:
+        for key in ("skills", "projects", "work_experiences"):
+            assert document[key] == expected[document["id"]][key]
+    assert exported[0]["work_experiences"][1]["company"] == "Company 1"
+
+    response = client.get("/api/v1/profiles/export?format=csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="profiles.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["id"]) for row in rows] == [1, 2, 3, 4]
+    for row in rows:
+        document = expected[int(row["id"])]
+        assert (row["skills"].split(";") if row["skills"] else []) == [skill["name"] for skill in document["skills"]]
+        assert json.loads(row["projects"]) == document["projects"]
+        assert json.loads(row["work_experiences"]) == document["work_experiences"]
+        assert row["email"] == document["email"]